@@ -2,7 +2,10 @@ import streamlit as st
 import pandas as pd
 import sys
 import os
+import io
+import hashlib
 import matplotlib.pyplot as plt
+from typing import Dict, Tuple
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -12,6 +15,86 @@ from visualization import DataVisualizer
 from apriori import Apriori
 from utils import save_results, print_summary
 
+# Streamlit reruns the whole script on every widget change. Each step below is cached,
+# keyed by the hash of the uploaded file and the parameters it depends on, so a rerun
+# only recomputes what a changed widget affects. Arguments starting with an underscore
+# are left out of the cache key: they are determined by the key's other arguments.
+
+
+def _figure_png(fig) -> bytes:
+    """Render a matplotlib figure to PNG bytes and close it"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', bbox_inches='tight')
+    plt.close(fig)  # Close the figure to free memory
+    return buffer.getvalue()
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_data(file_hash: str, _file_bytes: bytes) -> pd.DataFrame:
+    """Parse an uploaded CSV once per distinct file contents"""
+    return DataPreprocessor().load_data(io.BytesIO(_file_bytes))
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def prepare_transactions(file_hash: str, _file_bytes: bytes, _data: pd.DataFrame) -> DataPreprocessor:
+    """Group the rows into transactions once per file; the preprocessor is shared read-only
+
+    The transactions go through the on-disk cache of load_transactions, so an
+    upload seen before (even by an earlier app session) is memory-mapped
+    instead of grouped again.
+    """
+    preprocessor = DataPreprocessor()
+    preprocessor.transactions = transactions = preprocessor.load_transactions(io.BytesIO(_file_bytes))
+    # A cache hit leaves the rows unloaded; the item charts read them from the parsed upload
+    preprocessor.data = _data
+    if transactions:
+        # Analyze transaction patterns and recommend parameters
+        preprocessor.analyze_transaction_patterns()
+    return preprocessor
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def top_item_charts(file_hash: str, top_n: int, _preprocessor: DataPreprocessor) -> Tuple[bytes, bytes]:
+    """Bar and pie charts of the most frequent items, None if there are no items"""
+    item_counts = _preprocessor.get_frequent_items(top_n)
+    if item_counts.empty:
+        return None
+    visualizer = DataVisualizer()
+    return (_figure_png(visualizer.plot_top_items(item_counts, top_n)),
+            _figure_png(visualizer.plot_pie_chart_top_items(item_counts, 10)))
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def transaction_length_chart(file_hash: str, _transactions) -> bytes:
+    return _figure_png(DataVisualizer().plot_transaction_length_distribution(_transactions))
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def find_frequent_itemsets(file_hash: str, min_support: float, _transactions) -> Dict[int, Dict[frozenset, float]]:
+    """Mine the frequent itemsets once per file and min_support"""
+    return Apriori(min_support=min_support).find_frequent_itemsets(_transactions)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def generate_rules(file_hash: str, min_support: float, min_confidence: float,
+                   _frequent_itemsets: Dict, _transactions) -> Tuple:
+    """Derive the rules and their table from the cached itemsets, without mining again"""
+    apriori_algo = Apriori(min_support=min_support, min_confidence=min_confidence)
+    apriori_algo.frequent_itemsets = _frequent_itemsets
+    rules = apriori_algo.generate_rules(_transactions)
+    return rules, apriori_algo.get_rules_dataframe()
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def rule_charts(file_hash: str, min_support: float, min_confidence: float,
+                _rules, _frequent_itemsets: Dict) -> Tuple:
+    """Support/confidence scatter, itemset sizes and metric overview charts, None where there is nothing to plot"""
+    visualizer = DataVisualizer()
+    figures = (visualizer.plot_rules_metrics(_rules),
+               visualizer.plot_itemset_sizes(_frequent_itemsets),
+               visualizer.plot_support_confidence_lift(_rules, 15))
+    return tuple(_figure_png(fig) if fig else None for fig in figures)
+
 
 def main():
     st.set_page_config(
@@ -45,14 +128,12 @@ def main():
     uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
 
     if uploaded_file is not None:
-        # Initialize components
-        preprocessor = DataPreprocessor()
-        visualizer = DataVisualizer()
-        apriori_algo = Apriori(min_support=min_support, min_confidence=min_confidence)
+        file_bytes = uploaded_file.getvalue()
+        file_hash = hashlib.sha256(file_bytes).hexdigest()
 
         # Load and explore data
         with st.spinner("Loading data..."):
-            data = preprocessor.load_data(uploaded_file)
+            data = load_data(file_hash, file_bytes)
 
         if data is not None:
             # Display basic info
@@ -73,7 +154,9 @@ def main():
             # Data exploration
             if st.button("Explore Data"):
                 with st.spinner("Analyzing data..."):
-                    info = preprocessor.explore_data()
+                    explorer = DataPreprocessor()
+                    explorer.data = data
+                    info = explorer.explore_data()
 
                     # Display missing values
                     st.subheader("Missing Values")
@@ -85,7 +168,8 @@ def main():
 
             # Prepare transactions
             with st.spinner("Preparing transactions..."):
-                transactions = preprocessor.prepare_transactions()
+                preprocessor = prepare_transactions(file_hash, file_bytes, data)
+                transactions = preprocessor.transactions
 
                 if debug_mode:
                     st.subheader("🔍 Debug Information")
@@ -97,40 +181,34 @@ def main():
                             st.write(f"Transaction {i + 1}: {transaction}")
 
                 if transactions:
-                    # Analyze transaction patterns and recommend parameters
-                    preprocessor.analyze_transaction_patterns()
-
                     # Visualizations
                     st.subheader("📈 Data Visualizations")
 
                     # Top items
-                    item_counts = preprocessor.get_frequent_items(top_n_items)
-                    if not item_counts.empty:
+                    item_charts = top_item_charts(file_hash, top_n_items, preprocessor)
+                    if item_charts is not None:
                         col1, col2 = st.columns(2)
 
                         with col1:
                             st.subheader(f"Top {top_n_items} Most Frequent Items")
-                            fig1 = visualizer.plot_top_items(item_counts, top_n_items)
-                            st.pyplot(fig1)
-                            plt.close(fig1)  # Close the figure to free memory
+                            st.image(item_charts[0])
 
                         with col2:
                             st.subheader(f"Top 10 Items Distribution")
-                            fig2 = visualizer.plot_pie_chart_top_items(item_counts, 10)
-                            st.pyplot(fig2)
-                            plt.close(fig2)  # Close the figure to free memory
+                            st.image(item_charts[1])
 
                     # Transaction length distribution
                     st.subheader("Transaction Length Distribution")
-                    fig3 = visualizer.plot_transaction_length_distribution(transactions)
-                    st.pyplot(fig3)
-                    plt.close(fig3)  # Close the figure to free memory
+                    st.image(transaction_length_chart(file_hash, transactions))
 
-                    # Run Apriori algorithm
+                    # Run Apriori algorithm; results stay shown for this file while parameters change
                     if st.button("Run Apriori Algorithm"):
+                        st.session_state.mined_file = file_hash
+
+                    if st.session_state.get('mined_file') == file_hash:
                         with st.spinner("Finding frequent itemsets and generating rules..."):
                             # Find frequent itemsets
-                            frequent_itemsets = apriori_algo.find_frequent_itemsets(transactions)
+                            frequent_itemsets = find_frequent_itemsets(file_hash, min_support, transactions)
 
                             if debug_mode:
                                 st.subheader("🔍 Frequent Itemsets Debug")
@@ -148,15 +226,14 @@ def main():
                                     st.warning("No frequent itemsets found!")
                                     st.info("Try lowering the minimum support threshold")
 
-                            # Generate association rules
-                            rules = apriori_algo.generate_rules(transactions)
+                            # Generate association rules (only this step reruns when min_confidence changes)
+                            rules, rules_df = generate_rules(file_hash, min_support, min_confidence,
+                                                             frequent_itemsets, transactions)
 
                             # Display results
                             st.subheader("🎯 Association Rules Results")
 
                             if rules:
-                                # Convert to DataFrame for display
-                                rules_df = apriori_algo.get_rules_dataframe()
                                 st.dataframe(rules_df)
 
                                 # Download results
@@ -182,7 +259,7 @@ def main():
                                         st.metric("Highest Confidence", f"{rules[0]['confidence']:.4f}")
                                 with col4:
                                     if rules:
-                                        st.metric("Highest Lift", f"{max(r['lift'] for r in rules):.4f}")
+                                        st.metric("Highest Lift", f"{rules.column('lift').max():.4f}")
 
                                 # Itemset sizes
                                 st.subheader("Frequent Itemsets by Size")
@@ -195,29 +272,25 @@ def main():
 
                                 # Rules visualization
                                 st.subheader("Rules Visualization")
+                                metrics_chart, sizes_chart, overview_chart = rule_charts(
+                                    file_hash, min_support, min_confidence, rules, frequent_itemsets)
 
                                 col1, col2 = st.columns(2)
 
                                 with col1:
                                     st.subheader("Support vs Confidence")
-                                    fig4 = visualizer.plot_rules_metrics(rules)
-                                    if fig4:
-                                        st.pyplot(fig4)
-                                        plt.close(fig4)
+                                    if metrics_chart:
+                                        st.image(metrics_chart)
 
                                 with col2:
                                     st.subheader("Frequent Itemsets by Size")
-                                    fig5 = visualizer.plot_itemset_sizes(frequent_itemsets)
-                                    if fig5:
-                                        st.pyplot(fig5)
-                                        plt.close(fig5)
+                                    if sizes_chart:
+                                        st.image(sizes_chart)
 
                                 # Additional metrics visualization
                                 st.subheader("Rule Metrics Overview")
-                                fig6 = visualizer.plot_support_confidence_lift(rules, 15)
-                                if fig6:
-                                    st.pyplot(fig6)
-                                    plt.close(fig6)
+                                if overview_chart:
+                                    st.image(overview_chart)
 
                                 # Display top rules in an expandable section
                                 with st.expander("View Top 10 Rules Details"):
@@ -0,0 +1,241 @@
+"""Time the mining pipeline on the groceries dataset and on synthetic Quest datasets
+
+Every (dataset, algorithm, min_support) case runs load_data,
+prepare_transactions, find_frequent_itemsets, generate_rules and save_results
+``--repeat`` times and keeps the fastest time of each step. Peak memory is
+measured per step with tracemalloc in one extra run, so tracing doesn't slow
+the timed runs. Results are written as JSON; with ``--baseline`` the total
+times are compared to an earlier results file.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --datasets groceries T10I4D100K --algorithms apriori fpgrowth \\
+        --supports 0.01 0.005 --baseline benchmarks/results/baseline.json
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import gc
+import platform
+import subprocess
+import tempfile
+import tracemalloc
+from datetime import datetime
+from typing import List, Dict, Any
+
+import numpy as np
+import pandas as pd
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.join(BENCHMARK_DIR, '..')
+sys.path.append(os.path.join(REPO_DIR, 'src'))
+
+from data_preprocessing import DataPreprocessor
+from apriori import Apriori, ALGORITHMS
+from support_counting import SUPPORT_COUNTING_METHODS
+from utils import save_results, set_verbosity
+from instrumentation import peak_rss_bytes
+from synthetic import QuestGenerator, QUEST_NAME
+
+GROCERIES_PATH = os.path.join(REPO_DIR, 'data', 'Groceries_dataset.csv')
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+
+STEPS = ('load_data', 'prepare_transactions', 'find_frequent_itemsets', 'generate_rules', 'save_results')
+# Fields that identify a case when results files are compared
+CASE_KEYS = ('dataset', 'algorithm', 'support_counting', 'min_support', 'min_confidence')
+
+
+def resolve_dataset(name: str, directory: str, n_items: int = 1000, seed: int = 0) -> Dict[str, Any]:
+    """CSV path and description of a dataset: 'groceries', a Quest name such as T10I4D100K, or a CSV path
+
+    Quest datasets are generated into ``directory`` (generation is not timed).
+    """
+    if name == 'groceries':
+        return {'name': name, 'path': GROCERIES_PATH}
+    if QUEST_NAME.match(name):
+        generator = QuestGenerator.from_name(name, n_items=n_items, seed=seed)
+        path = generator.write_csv(os.path.join(directory, f"{generator.name}.csv"))
+        return {'name': generator.name, 'path': path, 'generator': generator.parameters()}
+    if os.path.exists(name):
+        return {'name': os.path.splitext(os.path.basename(name))[0], 'path': name}
+    raise ValueError(f"Unknown dataset '{name}': use 'groceries', a Quest name like T10I4D100K or a CSV path")
+
+
+def _run_pipeline(path: str, algorithm: str, min_support: float, min_confidence: float,
+                  support_counting: str, output_path: str, trace_memory: bool = False):
+    """Run every step once; returns seconds per step, peak traced bytes per step and the miner"""
+    timings, peaks = {}, {}
+    state = {}
+
+    def step(name, function):
+        if trace_memory:
+            tracemalloc.reset_peak()
+            traced_at_start = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = function()
+        timings[name] = time.perf_counter() - start
+        if trace_memory:
+            peaks[name] = max(0, tracemalloc.get_traced_memory()[1] - traced_at_start)
+        return result
+
+    preprocessor = DataPreprocessor()
+    step('load_data', lambda: preprocessor.load_data(path))
+    state['transactions'] = step('prepare_transactions', preprocessor.prepare_transactions)
+    miner = Apriori(min_support, min_confidence, support_counting=support_counting, algorithm=algorithm)
+    state['itemsets'] = step('find_frequent_itemsets', lambda: miner.find_frequent_itemsets(state['transactions']))
+    state['rules'] = step('generate_rules', lambda: miner.generate_rules(state['transactions']))
+    step('save_results', lambda: save_results(state['itemsets'], state['rules'], output_path, miner.run_stats))
+    return timings, peaks, miner, state['transactions']
+
+
+def run_case(path: str, algorithm: str = 'apriori', min_support: float = 0.01, min_confidence: float = 0.1,
+             support_counting: str = 'auto', repeat: int = 3, measure_memory: bool = True) -> Dict[str, Any]:
+    """Benchmark one dataset at one setting: fastest time per step over ``repeat`` runs, and peak memory"""
+    with tempfile.TemporaryDirectory() as output_path:
+        best = {}
+        for _ in range(repeat):
+            # Like timeit, keep garbage collection pauses out of the timings
+            gc.collect()
+            gc.disable()
+            try:
+                timings, _, miner, transactions = _run_pipeline(path, algorithm, min_support, min_confidence,
+                                                                support_counting, output_path)
+            finally:
+                gc.enable()
+            for name, seconds in timings.items():
+                best[name] = min(seconds, best.get(name, seconds))
+
+        peaks = {}
+        if measure_memory:
+            started = not tracemalloc.is_tracing()
+            if started:
+                tracemalloc.start()
+            try:
+                _, peaks, _, _ = _run_pipeline(path, algorithm, min_support, min_confidence,
+                                               support_counting, output_path, trace_memory=True)
+            finally:
+                if started:
+                    tracemalloc.stop()
+
+    lengths = transactions.lengths() if transactions else np.zeros(1)
+    stats = miner.run_stats.totals()
+    return {
+        'algorithm': algorithm,
+        'support_counting': support_counting,
+        'min_support': min_support,
+        'min_confidence': min_confidence,
+        'transactions': len(transactions),
+        'items': transactions.n_items,
+        'avg_transaction_length': float(np.mean(lengths)),
+        'frequent_itemsets': sum(len(itemsets) for itemsets in miner.frequent_itemsets.values()),
+        'itemsets_by_size': {k: len(itemsets) for k, itemsets in miner.frequent_itemsets.items()},
+        'rules': len(miner.association_rules),
+        'timings': best,
+        'total_time': sum(best.values()),
+        'peak_memory_bytes': peaks,
+        'max_peak_memory_bytes': max(peaks.values()) if peaks else None,
+        'peak_rss_bytes': peak_rss_bytes(),
+        'support_evaluations': stats.get('support_evaluations', 0),
+        'candidates': stats.get('candidates', 0),
+        'repeat': repeat,
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    """Machine and library versions the results were measured with"""
+    return {'created_at': datetime.now().isoformat(), 'git_revision': _git_revision(),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'processor': platform.processor(), 'cpu_count': os.cpu_count(),
+            'numpy': np.__version__, 'pandas': pd.__version__}
+
+
+def run_benchmarks(datasets: List[str], algorithms: List[str], supports: List[float], min_confidence: float = 0.1,
+                   support_counting: str = 'auto', repeat: int = 3, measure_memory: bool = True,
+                   n_items: int = 1000, seed: int = 0) -> Dict[str, Any]:
+    """Run every combination of dataset, algorithm and min_support"""
+    results = []
+    described = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        for name in datasets:
+            dataset = resolve_dataset(name, data_dir, n_items=n_items, seed=seed)
+            described[dataset['name']] = {key: value for key, value in dataset.items() if key != 'name'}
+            for algorithm in algorithms:
+                for min_support in supports:
+                    result = run_case(dataset['path'], algorithm, min_support, min_confidence,
+                                      support_counting, repeat, measure_memory)
+                    results.append({'dataset': dataset['name'], **result})
+                    print(f"{dataset['name']:>14} {algorithm:>9} support={min_support:<8g} "
+                          f"itemsets={result['frequent_itemsets']:<6} rules={result['rules']:<6} "
+                          f"total={result['total_time']:.3f}s")
+
+    return {'environment': environment(), 'datasets': described, 'results': results}
+
+
+def case_key(result: Dict[str, Any]) -> tuple:
+    return tuple(result[key] for key in CASE_KEYS)
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any]) -> pd.DataFrame:
+    """Per case, baseline and current time of every step and the speedup of the total"""
+    baseline_cases = {case_key(result): result for result in baseline['results']}
+    rows = []
+    for result in results['results']:
+        previous = baseline_cases.get(case_key(result))
+        if previous is None:
+            continue
+        row = dict(zip(CASE_KEYS, case_key(result)))
+        for step in STEPS:
+            row[f"{step} (s)"] = result['timings'].get(step)
+            row[f"{step} baseline (s)"] = previous['timings'].get(step)
+        row['speedup'] = previous['total_time'] / result['total_time'] if result['total_time'] else None
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the mining pipeline")
+    parser.add_argument('--datasets', nargs='+', default=['groceries', 'T10I4D10K', 'T10I4D50K'],
+                        help="'groceries', Quest names such as T10I4D100K, or CSV paths")
+    parser.add_argument('--algorithms', nargs='+', default=['apriori'], choices=ALGORITHMS)
+    parser.add_argument('--supports', nargs='+', type=float, default=[0.01, 0.005, 0.002])
+    parser.add_argument('--min-confidence', type=float, default=0.1)
+    parser.add_argument('--support-counting', default='auto', choices=SUPPORT_COUNTING_METHODS)
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per case, the fastest is kept")
+    parser.add_argument('--no-memory', action='store_true', help="skip the traced run measuring peak memory")
+    parser.add_argument('--items', type=int, default=1000, help="distinct items of the synthetic datasets")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the synthetic datasets")
+    parser.add_argument('--output', help="results JSON file (default: benchmarks/results/benchmark_<time>.json)")
+    parser.add_argument('--baseline', help="earlier results JSON file to compare against")
+    args = parser.parse_args()
+
+    set_verbosity(logging.WARNING)
+    results = run_benchmarks(args.datasets, args.algorithms, args.supports, args.min_confidence,
+                             args.support_counting, args.repeat, not args.no_memory, args.items, args.seed)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            comparison = compare(results, json.load(f))
+        if comparison.empty:
+            print("No case of the baseline matches these results")
+        else:
+            print(comparison[list(CASE_KEYS) + ['speedup']].to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
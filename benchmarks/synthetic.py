@@ -0,0 +1,179 @@
+"""Synthetic market-basket data in the style of the IBM Quest generator (Agrawal & Srikant, 1994)
+
+Datasets are named like the classic T10I4D100K: average transaction length
+T, average length of the potentially frequent patterns I, and D transactions.
+
+    python benchmarks/synthetic.py T10I4D100K data/T10I4D100K.csv --items 1000
+"""
+import os
+import re
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from transaction_store import TransactionStore
+
+QUEST_NAME = re.compile(r'^T(\d+(?:\.\d+)?)I(\d+(?:\.\d+)?)D(\d+)([KM]?)$', re.IGNORECASE)
+
+
+def parse_quest_name(name: str) -> Dict[str, Any]:
+    """Generator parameters of a dataset name such as 'T10I4D100K'"""
+    match = QUEST_NAME.match(name)
+    if not match:
+        raise ValueError(f"'{name}' is not a Quest dataset name like T10I4D100K")
+    avg_length, avg_pattern_length, count, unit = match.groups()
+    scale = {'': 1, 'K': 1000, 'M': 1000000}[unit.upper()]
+    return {'n_transactions': int(count) * scale, 'avg_transaction_length': float(avg_length),
+            'avg_pattern_length': float(avg_pattern_length)}
+
+
+class QuestGenerator:
+    """Deterministic basket generator following the IBM Quest model
+
+    ``n_patterns`` potentially frequent itemsets are drawn first, with
+    Poisson lengths around ``avg_pattern_length``; each one reuses a fraction
+    of the previous pattern's items (exponential with mean ``correlation``),
+    gets an exponential weight and a corruption level around
+    ``corruption_mean``. A transaction has a Poisson length around
+    ``avg_transaction_length`` and is filled with patterns picked by weight,
+    each losing items while a uniform draw stays below its corruption level.
+    A pattern that doesn't fit is added anyway half of the time and otherwise
+    carried over to the next transaction. The same seed gives the same data.
+    """
+
+    def __init__(self, n_transactions: int = 100000, avg_transaction_length: float = 10,
+                 n_items: int = 1000, avg_pattern_length: float = 4, n_patterns: int = 2000,
+                 correlation: float = 0.5, corruption_mean: float = 0.5, corruption_sd: float = 0.1,
+                 seed: int = 0):
+        self.n_transactions = n_transactions
+        self.avg_transaction_length = avg_transaction_length
+        self.n_items = n_items
+        self.avg_pattern_length = avg_pattern_length
+        self.n_patterns = n_patterns
+        self.correlation = correlation
+        self.corruption_mean = corruption_mean
+        self.corruption_sd = corruption_sd
+        self.seed = seed
+
+    @classmethod
+    def from_name(cls, name: str, **options) -> 'QuestGenerator':
+        """Generator for a dataset name such as 'T10I4D100K'; ``options`` set the other parameters"""
+        return cls(**{**parse_quest_name(name), **options})
+
+    @property
+    def name(self) -> str:
+        count = self.n_transactions
+        size = f"{count // 1000000}M" if count % 1000000 == 0 else f"{count // 1000}K" if count % 1000 == 0 else str(count)
+        return f"T{self.avg_transaction_length:g}I{self.avg_pattern_length:g}D{size}"
+
+    def parameters(self) -> Dict[str, Any]:
+        return {'n_transactions': self.n_transactions, 'avg_transaction_length': self.avg_transaction_length,
+                'n_items': self.n_items, 'avg_pattern_length': self.avg_pattern_length,
+                'n_patterns': self.n_patterns, 'correlation': self.correlation,
+                'corruption_mean': self.corruption_mean, 'corruption_sd': self.corruption_sd, 'seed': self.seed}
+
+    def _patterns(self, rng: np.random.Generator):
+        """Potentially frequent itemsets with their cumulative weights and corruption levels"""
+        patterns = []
+        previous = np.empty(0, dtype=np.int64)
+        for _ in range(self.n_patterns):
+            size = min(self.n_items, max(1, rng.poisson(self.avg_pattern_length)))
+            reused = min(len(previous), int(round(min(1.0, rng.exponential(self.correlation)) * size)))
+            items = set(rng.choice(previous, reused, replace=False).tolist()) if reused else set()
+            while len(items) < size:
+                items.add(int(rng.integers(self.n_items)))
+            pattern = np.array(sorted(items), dtype=np.int64)
+            patterns.append(pattern)
+            previous = pattern
+
+        weights = rng.exponential(1.0, self.n_patterns)
+        cumulative = np.cumsum(weights / weights.sum())
+        corruption = np.clip(rng.normal(self.corruption_mean, self.corruption_sd, self.n_patterns), 0.0, 1.0)
+        return patterns, cumulative, corruption
+
+    def transactions(self) -> List[List[int]]:
+        """Generate the transactions as sorted lists of item IDs"""
+        rng = np.random.default_rng(self.seed)
+        patterns, cumulative, corruption = self._patterns(rng)
+        sizes = np.maximum(1, rng.poisson(self.avg_transaction_length, self.n_transactions))
+        picks = self._pattern_picks(rng, patterns, cumulative, corruption)
+
+        transactions = []
+        carried = None
+        for size in sizes.tolist():
+            items = set()
+            while len(items) < size:
+                if carried is not None:
+                    pattern, carried = carried, None
+                else:
+                    pattern, coin = next(picks)
+                    if len(items) + len(pattern) > size and items and coin < 0.5:
+                        carried = pattern
+                        break
+                items.update(pattern)
+            transactions.append(sorted(items))
+        return transactions
+
+    def _pattern_picks(self, rng: np.random.Generator, patterns: List[np.ndarray], cumulative: np.ndarray,
+                       corruption: np.ndarray, block: int = 4096):
+        """Endless (corrupted pattern, uniform draw) pairs, with the random numbers drawn in blocks"""
+        width = max(len(pattern) for pattern in patterns)
+        while True:
+            indices = np.minimum(np.searchsorted(cumulative, rng.random(block)), self.n_patterns - 1)
+            # Items dropped while a uniform draw stays below the corruption level: geometric, minus the last draw
+            dropped = rng.geometric(1 - np.minimum(corruption[indices], 1 - 1e-9)) - 1
+            coins = rng.random(block)
+            keys = rng.random((block, width))
+            for i, index in enumerate(indices.tolist()):
+                pattern = patterns[index]
+                if dropped[i]:
+                    # Keep the items with the largest random keys
+                    keep = np.argsort(keys[i, :len(pattern)])[dropped[i]:]
+                    pattern = pattern[np.sort(keep)]
+                yield pattern.tolist(), coins[i]
+
+    def store(self) -> TransactionStore:
+        """Generate the transactions as a TransactionStore with item names 'item_<id>'"""
+        return TransactionStore.from_transactions([[f"item_{item}" for item in transaction]
+                                                   for transaction in self.transactions()])
+
+    def to_frame(self) -> pd.DataFrame:
+        """Generate the transactions as rows shaped like the groceries dataset
+
+        Each transaction gets its own Member_number on a fixed Date, so
+        DataPreprocessor.prepare_transactions groups them back unchanged.
+        """
+        transactions = self.transactions()
+        lengths = [len(transaction) for transaction in transactions]
+        return pd.DataFrame({
+            'Member_number': np.repeat(np.arange(1, len(transactions) + 1), lengths),
+            'Date': '01-01-2015',
+            'itemDescription': [f"item_{item}" for transaction in transactions for item in transaction]
+        })
+
+    def write_csv(self, path: str) -> str:
+        """Write the transactions as a groceries-style CSV file"""
+        self.to_frame().to_csv(path, index=False)
+        return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate an IBM Quest-style synthetic basket CSV")
+    parser.add_argument('name', help="dataset name such as T10I4D100K")
+    parser.add_argument('output', help="CSV file to write")
+    parser.add_argument('--items', type=int, default=1000, help="number of distinct items")
+    parser.add_argument('--patterns', type=int, default=2000, help="number of potentially frequent itemsets")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    generator = QuestGenerator.from_name(args.name, n_items=args.items, n_patterns=args.patterns, seed=args.seed)
+    generator.write_csv(args.output)
+    print(f"Wrote {generator.name} ({generator.n_transactions} transactions) to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
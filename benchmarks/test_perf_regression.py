@@ -0,0 +1,164 @@
+"""Performance regression gate on the groceries dataset
+
+Each point (min_support, min_confidence) must give exactly the itemsets and
+rules stored in results/golden_groceries.json, with every algorithm. With
+the default algorithm, the total pipeline time may not exceed
+results/baseline.json by more than PERF_TOLERANCE, a fraction (0.5 by
+default: run times on a shared machine swing by about a third). Time
+differences below MIN_TIME_SLACK seconds are ignored, and a case that looks
+slower is measured once more before it fails, keeping the faster of the two.
+The peak traced memory barely varies between runs, so it gets the tighter
+PERF_MEMORY_TOLERANCE (0.1 by default) and no second measurement.
+
+The baseline is a run_benchmarks.py results file, so it also serves as
+``--baseline`` there. It is machine specific: regenerate it (and the golden
+output) on the machine that runs the gate, after a change that is meant to
+move them:
+
+    UPDATE_PERF_BASELINE=1 python -m pytest benchmarks/test_perf_regression.py
+"""
+import os
+import sys
+import json
+import subprocess
+import pytest
+
+from run_benchmarks import run_case, case_key, environment, BENCHMARK_DIR, GROCERIES_PATH, RESULTS_DIR
+
+from data_preprocessing import DataPreprocessor
+from apriori import Apriori, ALGORITHMS
+
+BASELINE_PATH = os.path.join(RESULTS_DIR, 'baseline.json')
+GOLDEN_PATH = os.path.join(RESULTS_DIR, 'golden_groceries.json')
+
+POINTS = [(0.005, 0.1), (0.002, 0.05), (0.001, 0.05)]
+PERF_TOLERANCE = float(os.environ.get('PERF_TOLERANCE', 0.5))
+PERF_MEMORY_TOLERANCE = float(os.environ.get('PERF_MEMORY_TOLERANCE', 0.1))
+MIN_TIME_SLACK = 0.01
+REPEAT = 5
+UPDATE = os.environ.get('UPDATE_PERF_BASELINE') == '1'
+
+
+def _point_key(min_support: float, min_confidence: float) -> str:
+    return f"{min_support:g}/{min_confidence:g}"
+
+
+def _load(path: str) -> dict:
+    if not os.path.exists(path):
+        pytest.skip(f"{os.path.basename(path)} is missing, create it with UPDATE_PERF_BASELINE=1")
+    with open(path) as f:
+        return json.load(f)
+
+
+def _update(path: str, key: str, value):
+    """Store one entry of a JSON file of the gate, keeping the others"""
+    data = {}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        with open(path) as f:
+            data = json.load(f)
+    data[key] = value
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+
+
+def _update_baseline(result: dict):
+    """Store the result of one case in the baseline, replacing an earlier result of the same case"""
+    baseline = {'results': []}
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+    baseline['environment'] = environment()
+    baseline['results'] = [case for case in baseline['results'] if case_key(case) != case_key(result)] + [result]
+    with open(BASELINE_PATH, 'w') as f:
+        json.dump(baseline, f, indent=1, sort_keys=True)
+
+
+def _baseline_case(result: dict) -> dict:
+    for case in _load(BASELINE_PATH)['results']:
+        if case_key(case) == case_key(result):
+            return case
+    return None
+
+
+@pytest.fixture(scope='module')
+def transactions(tmp_path_factory):
+    if not os.path.exists(GROCERIES_PATH):
+        pytest.skip("groceries dataset not found")
+    # A private cache keeps test runs from writing into the repository's data directory
+    return DataPreprocessor().load_transactions(GROCERIES_PATH, cache_dir=str(tmp_path_factory.mktemp('cache')))
+
+
+def mine_output(transactions, algorithm: str, min_support: float, min_confidence: float) -> dict:
+    """Itemsets and rules in a stable, exactly comparable form (transaction counts, not supports)"""
+    total = len(transactions)
+    miner = Apriori(min_support, min_confidence, algorithm=algorithm)
+    itemsets = miner.find_frequent_itemsets(transactions)
+    rules = miner.generate_rules(transactions)
+    return {
+        'itemsets': sorted([sorted(itemset), round(support * total)]
+                           for level in itemsets.values() for itemset, support in level.items()),
+        'rules': sorted([sorted(rule['antecedent']), sorted(rule['consequent']),
+                         round(rule['support'] * total), round(rule['confidence'], 10)] for rule in rules),
+    }
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+@pytest.mark.parametrize('min_support,min_confidence', POINTS)
+def test_output_matches_golden(transactions, algorithm, min_support, min_confidence):
+    output = mine_output(transactions, algorithm, min_support, min_confidence)
+    key = _point_key(min_support, min_confidence)
+    if UPDATE and algorithm == 'apriori':
+        _update(GOLDEN_PATH, key, output)
+
+    golden = _load(GOLDEN_PATH).get(key)
+    if golden is None:
+        pytest.skip(f"no golden output for {key}")
+    assert output['itemsets'] == golden['itemsets']
+    assert output['rules'] == golden['rules']
+
+
+@pytest.mark.parametrize('min_support,min_confidence', POINTS)
+def test_no_performance_regression(min_support, min_confidence):
+    if not os.path.exists(GROCERIES_PATH):
+        pytest.skip("groceries dataset not found")
+    result = {'dataset': 'groceries', **run_case(GROCERIES_PATH, 'apriori', min_support, min_confidence,
+                                                 repeat=REPEAT)}
+    if UPDATE:
+        _update_baseline(result)
+
+    baseline = _baseline_case(result)
+    if baseline is None:
+        pytest.skip(f"no baseline for {_point_key(min_support, min_confidence)}")
+
+    allowed_time = max(baseline['total_time'] * (1 + PERF_TOLERANCE), baseline['total_time'] + MIN_TIME_SLACK)
+    if result['total_time'] > allowed_time and not UPDATE:
+        # Confirm on a second measurement, a busy machine can slow a single one
+        retry = run_case(GROCERIES_PATH, 'apriori', min_support, min_confidence, repeat=REPEAT, measure_memory=False)
+        if retry['total_time'] < result['total_time']:
+            result.update(timings=retry['timings'], total_time=retry['total_time'])
+    assert result['total_time'] <= allowed_time, (
+        f"total time {result['total_time']:.4f}s exceeds the baseline {baseline['total_time']:.4f}s "
+        f"by more than {PERF_TOLERANCE:.0%} (steps: {result['timings']}, baseline: {baseline['timings']})")
+
+    allowed_memory = baseline['max_peak_memory_bytes'] * (1 + PERF_MEMORY_TOLERANCE)
+    assert result['max_peak_memory_bytes'] <= allowed_memory, (
+        f"peak memory {result['max_peak_memory_bytes']} bytes exceeds the baseline "
+        f"{baseline['max_peak_memory_bytes']} bytes by more than {PERF_MEMORY_TOLERANCE:.0%} "
+        f"(steps: {result['peak_memory_bytes']}, baseline: {baseline['peak_memory_bytes']})")
+
+
+def test_benchmark_script_compares_against_baseline(tmp_path):
+    """The documented ``run_benchmarks.py --baseline`` command reads the gate's baseline"""
+    if not os.path.exists(GROCERIES_PATH):
+        pytest.skip("groceries dataset not found")
+    _load(BASELINE_PATH)
+    min_support, min_confidence = POINTS[0]
+    completed = subprocess.run(
+        [sys.executable, os.path.join(BENCHMARK_DIR, 'run_benchmarks.py'), '--datasets', 'groceries',
+         '--supports', str(min_support), '--min-confidence', str(min_confidence), '--repeat', '1', '--no-memory',
+         '--output', str(tmp_path / 'results.json'), '--baseline', BASELINE_PATH],
+        capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
+    assert 'speedup' in completed.stdout
@@ -1,37 +1,177 @@
 import pandas as pd
 import numpy as np
-from typing import List, Set, Tuple, Dict, Any
-from itertools import combinations
+from math import ceil, log, sqrt
+from typing import List, Set, Tuple, Dict, Any, Iterator, Iterable, Callable, Union
+from itertools import combinations, islice
 from collections import defaultdict
 import logging
 
+try:
+    from .support_counting import (make_support_counter, min_support_count, resolve_n_jobs, bitsets_fit,
+                                   estimate_bitset_bytes, BitsetSupportCounter, SUPPORT_COUNTING_METHODS)
+    from .fpgrowth import FPGrowth
+    from .eclat import Eclat
+    from .charm import Charm
+    from .mafia import Mafia
+    from .topk import TopKRules
+    from .rules import RuleSet, RULE_METRICS
+    from .data_preprocessing import DataPreprocessor
+    from .transaction_store import TransactionStore, EncodedTransactions, encode_transactions
+    from .sketches import make_sketch, SKETCH_METHODS
+    from .instrumentation import RunStats, PhaseStats
+except ImportError:
+    from support_counting import (make_support_counter, min_support_count, resolve_n_jobs, bitsets_fit,
+                                  estimate_bitset_bytes, BitsetSupportCounter, SUPPORT_COUNTING_METHODS)
+    from fpgrowth import FPGrowth
+    from eclat import Eclat
+    from charm import Charm
+    from mafia import Mafia
+    from topk import TopKRules
+    from rules import RuleSet, RULE_METRICS
+    from data_preprocessing import DataPreprocessor
+    from transaction_store import TransactionStore, EncodedTransactions, encode_transactions
+    from sketches import make_sketch, SKETCH_METHODS
+    from instrumentation import RunStats, PhaseStats
+
 logger = logging.getLogger(__name__)
 
+ALGORITHMS = ('apriori', 'fpgrowth', 'eclat', 'declat')
+OUTPUTS = ('all', 'closed', 'maximal')
+
+# Keys buffered before a sketch is updated, so vectorized sketches hash them in batches
+SKETCH_BATCH_SIZE = 1 << 16
+
+
+def join_by_prefix(sorted_itemsets: List[Tuple]) -> Iterator[Tuple]:
+    """Join sorted (k-1)-tuples that share their first k-2 items into sorted k-tuples
+
+    ``sorted_itemsets`` must be sorted, so tuples with the same prefix are adjacent.
+    """
+    start = 0
+    while start < len(sorted_itemsets):
+        prefix = sorted_itemsets[start][:-1]
+        end = start + 1
+        while end < len(sorted_itemsets) and sorted_itemsets[end][:-1] == prefix:
+            end += 1
+
+        last_items = [itemset[-1] for itemset in sorted_itemsets[start:end]]
+        for i in range(len(last_items)):
+            for j in range(i + 1, len(last_items)):
+                yield prefix + (last_items[i], last_items[j])
+
+        start = end
+
+
+def _named_item_bitmaps(store: TransactionStore) -> Dict[str, int]:
+    """Transaction bitmaps of a store keyed by item name, comparable across stores"""
+    return {store.vocabulary[item]: bitmap for item, bitmap in store.item_bitmaps().items()}
+
+
+def _pair_codes(store: TransactionStore, start: int, stop: int) -> np.ndarray:
+    """Codes ``a * n_items + b`` of the item pairs a < b of transactions start..stop-1, vectorized per length"""
+    lengths = store.lengths()[start:stop]
+    offsets = store.offsets[start:stop]
+    codes = []
+    for length in np.unique(lengths[lengths >= 2]).tolist():
+        rows = store.items[offsets[lengths == length][:, None] + np.arange(length)].astype(np.int64)
+        first, second = np.triu_indices(length, 1)
+        codes.append((rows[:, first] * store.n_items + rows[:, second]).ravel())
+    return np.concatenate(codes) if codes else np.zeros(0, dtype=np.int64)
+
+
+def hoeffding_sample_size(error: float, confidence: float) -> int:
+    """Sample size for which an estimated support is within ``error`` of the true one with probability ``confidence``"""
+    return ceil(log(2 / (1 - confidence)) / (2 * error ** 2))
+
+
+def hoeffding_error(sample_size: int, confidence: float) -> float:
+    """Half-width of the ``confidence`` interval of a support estimated from ``sample_size`` transactions"""
+    return sqrt(log(2 / (1 - confidence)) / (2 * sample_size))
+
 
 class Apriori:
-    def __init__(self, min_support: float = 0.01, min_confidence: float = 0.5):
+    def __init__(self, min_support: float = 0.01, min_confidence: float = 0.5,
+                 support_counting: str = 'auto', algorithm: str = 'apriori', n_jobs: int = 1,
+                 sketch: str = None, sketch_error: float = None, output: str = 'all',
+                 track_memory: bool = False):
+        # algorithm: 'apriori' mines level by level, 'fpgrowth' mines an FP-tree without candidates,
+        # 'eclat' / 'declat' mine depth-first over tidsets / diffsets
+        # support_counting: 'bitset' intersects per-item transaction-ID bitmaps,
+        # 'scan' passes over the transactions, 'mmap' reads packed bitmaps memory-mapped from disk,
+        # 'auto' uses bitsets when they fit in memory and 'mmap' otherwise
+        # n_jobs: processes counting candidate supports over transaction shards (-1 for all CPUs)
+        # sketch: 'lossy', 'spacesaving' or 'countmin' finds the 1- and 2-itemsets of the level-wise
+        # miner in one pass with fixed-memory counters, then counts the survivors exactly; sketch_error
+        # is the counters' error relative to the number of transactions (default min_support / 10)
+        # output: 'all' frequent itemsets, or only the 'closed' ones (CHARM) or the 'maximal' ones (MAFIA);
+        # get_support() recovers the support of any subset left out
+        # track_memory: trace the memory allocated by every phase of run_stats with tracemalloc (slow)
+        if support_counting not in SUPPORT_COUNTING_METHODS:
+            raise ValueError(f"Unknown support_counting '{support_counting}'. "
+                             f"Choose one of {SUPPORT_COUNTING_METHODS}")
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm '{algorithm}'. Choose one of {ALGORITHMS}")
+        if output not in OUTPUTS:
+            raise ValueError(f"Unknown output '{output}'. Choose one of {OUTPUTS}")
+        if sketch is not None and sketch not in SKETCH_METHODS:
+            raise ValueError(f"Unknown sketch '{sketch}'. Choose one of {SKETCH_METHODS}")
+
         self.min_support = min_support
         self.min_confidence = min_confidence
+        self.support_counting = support_counting
+        self.algorithm = algorithm
+        self.n_jobs = resolve_n_jobs(n_jobs)
+        self.sketch = sketch
+        self.output = output
+        self.sketch_error = sketch_error if sketch_error is not None else min_support / 10
+        self.track_memory = track_memory
         self.frequent_itemsets = {}
-        self.association_rules = []
+        self.association_rules = RuleSet.from_rules([])
+        # Item names of the transactions being mined, indexed by item ID
+        self._vocabulary = []
+        # Infrequent candidates counted by the last level-wise run (item IDs -> count)
+        self._negative_border = {}
+        # Number of transactions of the last run, which rules are derived over
+        self._total_transactions = 0
+        # State kept for update(): the mined transaction stores and exact counts of
+        # every frequent itemset plus the infrequent itemsets already counted
+        self._history = []
+        # Item-name bitmaps over the whole history, grown by update() once a rescan builds them
+        self._history_counter = None
+        self._itemset_counts = {}
+        # Filled by find_frequent_itemsets_sampled: (low, high) support interval per itemset and a run summary
+        self.support_intervals = {}
+        self.sampling_report = {}
+        # Closed itemsets with their supports and, per item, a bitmap of the closed itemsets holding it
+        self._closed_index = None
+        # Per-phase counters and timings of the last run (see RunStats)
+        self.run_stats = RunStats()
+        self._confidence_evaluations = 0
 
-    def _get_frequent_1_itemsets(self, transactions: List[List[str]]) -> Dict[frozenset, float]:
+    def _new_run_stats(self, mode: str, **config: Any) -> RunStats:
+        """Start the statistics of a new run, with the settings it runs under"""
+        self.run_stats = RunStats(track_memory=self.track_memory, mode=mode, algorithm=self.algorithm, output=self.output,
+                                  min_support=self.min_support, min_confidence=self.min_confidence,
+                                  support_counting=self.support_counting, n_jobs=self.n_jobs,
+                                  sketch=self.sketch, **config)
+        return self.run_stats
+
+    def _get_frequent_1_itemsets(self, transactions: EncodedTransactions) -> Dict[frozenset, float]:
         """Find frequent 1-itemsets"""
-        item_counts = defaultdict(int)
         total_transactions = len(transactions)
 
-        print(f"Total transactions: {total_transactions}")
-        print(f"Min support: {self.min_support}")
+        logger.info("Total transactions: %d", total_transactions)
+        logger.info("Min support: %s", self.min_support)
 
-        for transaction in transactions:
-            for item in transaction:
-                item_counts[item] += 1
+        # Items are unique within an encoded transaction, so one bincount over the CSR items array
+        # counts each item once per transaction without iterating transactions in Python
+        item_counts = {item: int(count) for item, count in enumerate(transactions.item_counts()) if count}
 
-        # Debug: print item frequencies
-        print("Item frequencies (top 20):")
-        for item, count in sorted(item_counts.items(), key=lambda x: x[1], reverse=True)[:20]:
-            support = count / total_transactions
-            print(f"  {item}: {count} transactions, support = {support:.4f}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Item frequencies (top 20):")
+            for item, count in sorted(item_counts.items(), key=lambda x: x[1], reverse=True)[:20]:
+                logger.debug("  %s: %d transactions, support = %.4f",
+                             self._vocabulary[item], count, count / total_transactions)
 
         frequent_1_itemsets = {}
         for item, count in item_counts.items():
@@ -39,9 +179,93 @@ class Apriori:
             if support >= self.min_support:
                 frequent_1_itemsets[frozenset([item])] = support
 
-        print(f"Found {len(frequent_1_itemsets)} frequent 1-itemsets")
+        logger.info("Found %d frequent 1-itemsets", len(frequent_1_itemsets))
         return frequent_1_itemsets
 
+    def _sketch_frequent_1_2_itemsets(self, transactions: EncodedTransactions) -> Dict[int, Dict[frozenset, int]]:
+        """Find candidate frequent 1- and 2-itemsets in a single pass with counting sketches
+
+        Sketch estimates never undercount, so no frequent item or pair is missed,
+        but some survivors may be infrequent: the estimated counts are returned
+        for _count_sketch_survivors to check. Each sketch's error is scaled to the
+        length of its stream, so both overestimate by at most sketch_error times
+        the number of transactions (pairs outnumber transactions many times over).
+
+        The sketches trade time for memory: their counters take memory fixed by
+        the error instead of one bitmap per item, but every pair occurrence of
+        every transaction is counted. Pairs are fed as integer codes
+        ``a * n_items + b`` in batches of about SKETCH_BATCH_SIZE; Count-Min
+        hashes a batch with NumPy and keeps pace with exact bitset counting,
+        while Lossy Counting and Space-Saving update a dict entry per distinct
+        pair of a batch and take about 1.5 to 3 times as long. When the item
+        bitmaps fit in memory, exact counting (sketch=None) is the faster choice.
+        """
+        store = transactions.store
+        total_transactions = len(store)
+        min_count = min_support_count(self.min_support, total_transactions)
+        n_items = store.n_items
+        lengths = store.lengths()
+        pair_counts = lengths * (lengths - 1) // 2
+        item_sketch = make_sketch(self.sketch, self._stream_error(int(lengths.sum()), total_transactions))
+        pair_sketch = make_sketch(self.sketch, self._stream_error(int(pair_counts.sum()), total_transactions))
+
+        # Transaction ranges holding about SKETCH_BATCH_SIZE pairs each
+        cumulative_pairs = np.cumsum(pair_counts)
+        stops = np.searchsorted(cumulative_pairs, np.arange(SKETCH_BATCH_SIZE, int(cumulative_pairs[-1]) + 1,
+                                                            SKETCH_BATCH_SIZE), side='right') \
+            if len(cumulative_pairs) else np.zeros(0, dtype=np.int64)
+        start = 0
+        for stop in np.append(np.unique(stops), total_transactions).tolist():
+            if stop <= start:
+                continue
+            item_sketch.update(store.items[store.offsets[start]:store.offsets[stop]])
+            pair_sketch.update(_pair_codes(store, start, stop))
+            start = stop
+
+        logger.info("Sketch (%s): item counts overestimated by at most %d, pair counts by at most %d "
+                    "(%d + %d counters)", self.sketch, item_sketch.error_bound(), pair_sketch.error_bound(),
+                    len(item_sketch), len(pair_sketch))
+
+        item_counts = item_sketch.frequent(min_count, candidates=range(transactions.n_items))
+        candidate_items = {frozenset([item]): count for item, count in item_counts.items()}
+
+        candidates = [min(candidate) * n_items + max(candidate) for candidate in self._apriori_gen(candidate_items, 2)]
+        candidate_pairs = {frozenset(divmod(code, n_items)): count
+                           for code, count in pair_sketch.frequent(min_count, candidates=candidates).items()}
+
+        logger.info("%d 1-itemsets and %d 2-itemsets may be frequent according to the sketches",
+                    len(candidate_items), len(candidate_pairs))
+        return {1: candidate_items, 2: candidate_pairs}
+
+    def _stream_error(self, stream_total: int, total_transactions: int) -> float:
+        """Relative error for a sketch over ``stream_total`` keys that overcounts by at most sketch_error * N"""
+        return self.sketch_error * total_transactions / max(stream_total, total_transactions, 1)
+
+    def _count_sketch_survivors(self, survivors: Dict[int, Dict[frozenset, int]], support_counter,
+                                total_transactions: int, stats: PhaseStats) -> Dict[int, Dict[frozenset, float]]:
+        """Count the 1- and 2-itemsets let through by the sketches exactly, keeping the frequent ones"""
+        min_count = min_support_count(self.min_support, total_transactions)
+        item_counts = support_counter.count_many(survivors[1])
+        frequent_1_itemsets = {itemset: count / total_transactions
+                               for itemset, count in item_counts.items() if count >= min_count}
+
+        # Pairs of an item the sketch overestimated are infrequent without counting them
+        pairs = [pair for pair in survivors[2] if all(frozenset([item]) in frequent_1_itemsets for item in pair)]
+        frequent_2_itemsets = {}
+        for pair, count in support_counter.count_many(pairs).items():
+            if count >= min_count:
+                frequent_2_itemsets[pair] = count / total_transactions
+            else:
+                self._negative_border[pair] = count
+
+        stats.add(support_evaluations=len(item_counts) + len(pairs),
+                  false_positives=len(survivors[1]) + len(survivors[2])
+                  - len(frequent_1_itemsets) - len(frequent_2_itemsets),
+                  frequent=len(frequent_1_itemsets) + len(frequent_2_itemsets))
+        logger.info("Found %d frequent 1-itemsets and %d frequent 2-itemsets among the sketch survivors",
+                    len(frequent_1_itemsets), len(frequent_2_itemsets))
+        return {1: frequent_1_itemsets, 2: frequent_2_itemsets}
+
     def _has_infrequent_subset(self, candidate: Set, prev_frequent: Dict) -> bool:
         """Check if any subset of candidate is infrequent"""
         k = len(candidate)
@@ -55,197 +279,774 @@ class Apriori:
                 return True
         return False
 
-    def _apriori_gen(self, prev_frequent: Dict, k: int) -> Set[frozenset]:
-        """Generate candidate itemsets of size k"""
+    def _apriori_gen(self, prev_frequent: Dict, k: int, stats: PhaseStats = None) -> Set[frozenset]:
+        """Generate candidate itemsets of size k, adding the join and prune counts to ``stats``"""
         candidates = set()
-        prev_itemsets = list(prev_frequent.keys())
+        joined_count = 0
 
-        print(f"Generating {k}-itemsets from {len(prev_itemsets)} {k - 1}-itemsets")
+        logger.info("Generating %d-itemsets from %d %d-itemsets", k, len(prev_frequent), k - 1)
 
-        # Join step: combine itemsets that share first k-2 items
-        for i in range(len(prev_itemsets)):
-            for j in range(i + 1, len(prev_itemsets)):
-                itemset1 = prev_itemsets[i]
-                itemset2 = prev_itemsets[j]
+        # Join step: only itemsets sharing their first k-2 (sorted) items are paired
+        sorted_itemsets = sorted(tuple(sorted(itemset)) for itemset in prev_frequent)
+        for joined in join_by_prefix(sorted_itemsets):
+            joined_count += 1
+            candidate = frozenset(joined)
+            # Prune step: check if all subsets are frequent
+            if not self._has_infrequent_subset(candidate, prev_frequent):
+                candidates.add(candidate)
 
-                # Check if we can join these itemsets
-                union_set = itemset1.union(itemset2)
-                if len(union_set) == k:
-                    # Prune step: check if all subsets are frequent
-                    if not self._has_infrequent_subset(union_set, prev_frequent):
-                        candidates.add(frozenset(union_set))
-
-        print(f"Generated {len(candidates)} candidate {k}-itemsets")
+        logger.info("Generated %d candidate %d-itemsets", len(candidates), k)
+        if stats is not None:
+            stats.add(candidates_generated=joined_count, pruned_by_subset_check=joined_count - len(candidates),
+                      candidates=len(candidates))
         return candidates
 
-    def _calculate_support(self, itemset: Set, transactions: List[List[str]]) -> float:
-        """Calculate support for an itemset"""
-        count = 0
-        for transaction in transactions:
-            if itemset.issubset(set(transaction)):
-                count += 1
-        return count / len(transactions)
-
-    def find_frequent_itemsets(self, transactions: List[List[str]]) -> Dict[int, Dict[frozenset, float]]:
-        """Find all frequent itemsets using Apriori algorithm"""
-        print("Finding frequent itemsets...")
+    def find_frequent_itemsets(self, transactions: Union[TransactionStore, List[List[str]]]) -> Dict[int, Dict[frozenset, float]]:
+        """Find all frequent itemsets using the configured algorithm"""
+        logger.info("Finding frequent itemsets (%s)...", self.algorithm)
         self.frequent_itemsets = {}
+        self._history = []
+        self._history_counter = None
+        self._total_transactions = 0
 
         if not transactions:
-            print("No transactions provided")
+            logger.warning("No transactions provided")
             return {}
 
-        # Find frequent 1-itemsets
-        self.frequent_itemsets[1] = self._get_frequent_1_itemsets(transactions)
+        # Mine on integer item IDs, names are restored only in the result
+        store = encode_transactions(transactions)
+        self._new_run_stats('full', transactions=len(store))
+        frequent_itemsets = self._store_frequent_itemsets(self._mine_store(store))
+        self._start_history(store)
+        return frequent_itemsets
 
-        if not self.frequent_itemsets[1]:
-            print("No frequent 1-itemsets found. Try lowering min_support.")
-            return {}
+    def _start_history(self, store: TransactionStore):
+        """Keep the exact itemset counts of a full run so update() can fold in new transactions"""
+        total_transactions = len(store)
+        counts = {itemset: round(support * total_transactions)
+                  for itemsets in self.frequent_itemsets.values()
+                  for itemset, support in itemsets.items()}
+        # Every item is tracked, so an item missing from the counts never occurred in the history
+        for item, count in enumerate(store.item_counts()):
+            if count:
+                counts.setdefault(frozenset([store.vocabulary[item]]), int(count))
+        for itemset, count in self._negative_border.items():
+            counts[frozenset(store.decode(itemset))] = count
 
+        self._history = [store]
+        self._history_counter = None
+        self._total_transactions = total_transactions
+        self._itemset_counts = counts
+
+    def update(self, new_transactions: Union[TransactionStore, List[List[str]]]) -> Dict[int, Dict[frozenset, float]]:
+        """Add new transactions to the mined history and update the frequent itemsets and rules (FUP)
+
+        The counts of the frequent itemsets and the infrequent ones already counted
+        (the negative border) are kept from the previous run, so only the new
+        transactions are scanned for them. Any other itemset was infrequent in the
+        history and can only become frequent if it is frequent enough in the new
+        transactions alone; only those are counted over the history. The result
+        equals a full rerun of find_frequent_itemsets on history plus new transactions.
+        A miner that never ran mines the new transactions from scratch; after SON
+        or sampled mining, which keep no transactions, update() raises ValueError.
+        """
+        if self.output != 'all':
+            raise ValueError("Incremental updates need the counts of all frequent itemsets, use output='all'")
+        if not self._history:
+            if self._total_transactions:
+                raise ValueError("The last run (SON or sampling) kept no transactions to update, "
+                                 "use find_frequent_itemsets before update()")
+            logger.info("No previous run to update, mining the new transactions from scratch")
+            self.find_frequent_itemsets(new_transactions)
+            if self.frequent_itemsets:
+                self._derive_rules(self._total_transactions)
+            return self.frequent_itemsets
+
+        delta = encode_transactions(new_transactions)
+        if not len(delta):
+            return self.frequent_itemsets
+        run_stats = self._new_run_stats('update', transactions=self._total_transactions + len(delta),
+                                        new_transactions=len(delta))
+
+        old_total = self._total_transactions
+        total_transactions = old_total + len(delta)
+        min_count = min_support_count(self.min_support, total_transactions)
+        # An untracked itemset occurred fewer than min_support_count(old_total) times in the history
+        min_delta_count = min_count - min_support_count(self.min_support, old_total) + 1
+        logger.info("Updating frequent itemsets with %d new transactions (%d -> %d)",
+                    len(delta), old_total, total_transactions)
+
+        with run_stats.phase('level 1') as stats:
+            counts = {itemset: count for itemset, count in self._itemset_counts.items() if len(itemset) == 1}
+            for item, count in enumerate(delta.item_counts()):
+                if count:
+                    itemset = frozenset([delta.vocabulary[item]])
+                    counts[itemset] = counts.get(itemset, 0) + int(count)
+
+            frequent_itemsets = {1: {itemset: count / total_transactions
+                                     for itemset, count in counts.items() if count >= min_count}}
+            stats.add(support_evaluations=delta.n_items, frequent=len(frequent_itemsets[1]))
+        delta_counter = make_support_counter(delta.encoded, self.support_counting, n_jobs=self.n_jobs)
+        rescanned = 0
         k = 2
+        try:
+            while frequent_itemsets[k - 1]:
+                with run_stats.phase(f'level {k}') as stats:
+                    candidates = self._apriori_gen(frequent_itemsets[k - 1], k, stats)
+                    delta_counts = self._count_named_itemsets(delta, delta_counter, candidates)
+
+                    unknown = []
+                    for candidate, delta_count in delta_counts.items():
+                        if candidate in self._itemset_counts:
+                            counts[candidate] = self._itemset_counts[candidate] + delta_count
+                        elif delta_count >= min_delta_count:
+                            unknown.append(candidate)
 
-        while self.frequent_itemsets[k - 1]:
-            print(f"Generating {k}-itemsets...")
-            candidates = self._apriori_gen(self.frequent_itemsets[k - 1], k)
-            frequent_k = {}
+                    # Rescan the history only for itemsets that may have newly become frequent
+                    if unknown:
+                        rescanned += len(unknown)
+                        for itemset, count in self._count_history(unknown).items():
+                            counts[itemset] = count + delta_counts[itemset]
 
-            for candidate in candidates:
-                support = self._calculate_support(candidate, transactions)
-                if support >= self.min_support:
-                    frequent_k[candidate] = support
+                    frequent_itemsets[k] = {candidate: counts[candidate] / total_transactions
+                                            for candidate in candidates
+                                            if counts.get(candidate, 0) >= min_count}
+                    # Each rescanned itemset is counted once more over the history
+                    stats.add(support_evaluations=len(candidates) + len(unknown),
+                              history_rescans=len(unknown), frequent=len(frequent_itemsets[k]))
+                logger.info("Found %d frequent %d-itemsets", len(frequent_itemsets[k]), k)
+                k += 1
+        finally:
+            delta_counter.close()
 
-            self.frequent_itemsets[k] = frequent_k
-            print(f"Found {len(frequent_k)} frequent {k}-itemsets")
+        logger.info("Rescanned the history for %d itemsets", rescanned)
 
-            if not frequent_k:
-                break
-            k += 1
+        # Counts dropped here belong to infrequent itemsets, which the delta bound above still covers
+        self._history.append(delta)
+        if self._history_counter is not None:
+            self._history_counter.extend(_named_item_bitmaps(delta), len(delta))
+        self._total_transactions = total_transactions
+        self._itemset_counts = counts
+
+        self._store_frequent_itemsets(frequent_itemsets)
+        if self.frequent_itemsets:
+            self._derive_rules(total_transactions)
+        return self.frequent_itemsets
+
+    def _count_history(self, itemsets: List[frozenset]) -> Dict[frozenset, int]:
+        """Count itemsets of item names over every transaction mined so far
+
+        When bitsets are used, the item bitmaps built by the first rescan are kept
+        and grown by update(), so a rescan is one bitmap intersection per itemset.
+        Otherwise the history stores are merged and counted in one pass.
+        """
+        if self._history_counter is None:
+            if len(self._history) > 1:
+                self._history = [TransactionStore.concat(self._history)]
+            store = self._history[0]
+            if self.support_counting == 'bitset' or (
+                    self.support_counting == 'auto' and bitsets_fit(estimate_bitset_bytes(store.encoded))):
+                self._history_counter = BitsetSupportCounter([])
+                self._history_counter.extend(_named_item_bitmaps(store), len(store))
+        if self._history_counter is not None:
+            return self._history_counter.count_many(itemsets)
+
+        store = self._history[0]
+        support_counter = make_support_counter(store.encoded, self.support_counting, n_jobs=self.n_jobs)
+        try:
+            return self._count_named_itemsets(store, support_counter, itemsets)
+        finally:
+            support_counter.close()
+
+    def _count_named_itemsets(self, store: TransactionStore, support_counter,
+                              itemsets: Iterable[frozenset]) -> Dict[frozenset, int]:
+        """Count itemsets of item names over a store with a support counter built on its encoded view"""
+        counts = {}
+        itemsets_by_size = defaultdict(list)
+        for itemset in itemsets:
+            counts[itemset] = 0
+            itemsets_by_size[len(itemset)].append(itemset)
+
+        item_to_id = store.item_to_id
+        for size_itemsets in itemsets_by_size.values():
+            # Itemsets with an item absent from the store can't occur in it
+            encoded = {frozenset(item_to_id[item] for item in itemset): itemset
+                       for itemset in size_itemsets
+                       if all(item in item_to_id for item in itemset)}
+            if encoded:
+                for encoded_itemset, count in support_counter.count_many(encoded).items():
+                    counts[encoded[encoded_itemset]] = count
+        return counts
+
+    def find_frequent_itemsets_son(self, partitions: Union[str, Callable[[], Iterable[List[List[str]]]]],
+                                   chunksize: int = 100000) -> Dict[int, Dict[frozenset, float]]:
+        """Find all frequent itemsets with the two-phase SON algorithm, one partition in memory at a time
+
+        ``partitions`` is a CSV path (read with DataPreprocessor.iter_transaction_chunks)
+        or a callable returning a fresh iterable of transaction lists; it is read twice.
+        Phase one mines each partition at the same relative min_support, so every
+        globally frequent itemset is locally frequent in at least one partition.
+        Phase two counts the union of the local results over all partitions.
+        """
+        if self.output != 'all':
+            raise ValueError("SON mining needs every locally frequent itemset as a candidate, use output='all'")
+        logger.info("Finding frequent itemsets (SON, %s per partition)...", self.algorithm)
+        self.frequent_itemsets = {}
+        self._history = []
+        self._history_counter = None
+        self._total_transactions = 0
+
+        if isinstance(partitions, str):
+            file_path = partitions
+            preprocessor = DataPreprocessor()
+            partitions = lambda: preprocessor.iter_transaction_chunks(file_path, chunksize)
+
+        # Phase 1: locally frequent itemsets of every partition (their levels are recorded per partition)
+        run_stats = self._new_run_stats('son')
+        candidates = set()
+        total_transactions = 0
+        for i, partition in enumerate(partitions()):
+            total_transactions += len(partition)
+            if not partition:
+                continue
+            local_itemsets = self._mine_store(encode_transactions(partition))
+            for itemsets in local_itemsets.values():
+                candidates.update(itemsets)
+            logger.info("Partition %d: %d transactions, %d candidates so far", i + 1, len(partition), len(candidates))
+
+        run_stats.config['transactions'] = total_transactions
+        self._total_transactions = total_transactions
+        if not total_transactions:
+            logger.warning("No transactions provided")
+            return {}
+
+        # Phase 2: one global counting pass over the union of the local results
+        counts = defaultdict(int)
+        with run_stats.phase('count candidates', candidates=len(candidates)) as stats:
+            for partition in partitions():
+                if not partition:
+                    continue
+                store = encode_transactions(partition)
+                support_counter = make_support_counter(store.encoded, self.support_counting, n_jobs=self.n_jobs)
+                try:
+                    for candidate, count in self._count_named_itemsets(store, support_counter, candidates).items():
+                        counts[candidate] += count
+                finally:
+                    support_counter.close()
+                stats.add(support_evaluations=len(candidates))
+
+        frequent_itemsets = defaultdict(dict)
+        for candidate in candidates:
+            support = counts[candidate] / total_transactions
+            if support >= self.min_support:
+                frequent_itemsets[len(candidate)][candidate] = support
+        frequent_itemsets = {k: frequent_itemsets[k] for k in sorted(frequent_itemsets)}
+
+        return self._store_frequent_itemsets(frequent_itemsets)
+
+    def find_frequent_itemsets_sampled(self, transactions: Union[TransactionStore, List[List[str]]],
+                                       sample_size: int = None, error: float = 0.005, confidence: float = 0.95,
+                                       verify: bool = False, random_state: int = None) -> Dict[int, Dict[frozenset, float]]:
+        """Estimate the frequent itemsets from a random sample of the transactions (Toivonen's algorithm)
+
+        Without ``sample_size`` the sample is sized so each estimated support is
+        within ``error`` of the true support with probability ``confidence``
+        (Hoeffding bound, per itemset). The sample is mined at min_support
+        lowered by that error, which makes missing a frequent itemset unlikely.
+        Itemsets whose estimated support reaches min_support are returned, and
+        their confidence intervals are kept in self.support_intervals.
+
+        With ``verify`` one pass over all transactions counts the sampled itemsets
+        and their negative border exactly. Supports are then exact; if a border
+        itemset turns out frequent, some frequent supersets may be missing, which
+        is reported in self.sampling_report.
+        """
+        if self.output != 'all':
+            raise ValueError("Sampling verifies the negative border of all frequent itemsets, use output='all'")
+        self.frequent_itemsets = {}
+        self._history = []
+        self._history_counter = None
+        self._total_transactions = 0
+        self.support_intervals = {}
+        self.sampling_report = {}
+
+        if not transactions:
+            logger.warning("No transactions provided")
+            return {}
+
+        store = encode_transactions(transactions)
+        total_transactions = len(store)
+        self._total_transactions = total_transactions
+        run_stats = self._new_run_stats('sampled', transactions=total_transactions)
+
+        if sample_size is None:
+            sample_size = hoeffding_sample_size(error, confidence)
+        else:
+            error = hoeffding_error(sample_size, confidence)
+
+        if sample_size >= total_transactions:
+            logger.info("Sample size %d covers all %d transactions, mining exactly", sample_size, total_transactions)
+            frequent_itemsets = self.find_frequent_itemsets(store)
+            self.support_intervals = {itemset: (support, support)
+                                      for itemsets in frequent_itemsets.values()
+                                      for itemset, support in itemsets.items()}
+            self.sampling_report = {'sample_size': total_transactions, 'total_transactions': total_transactions,
+                                    'error': 0.0, 'confidence': confidence,
+                                    'lowered_support': self.min_support, 'verified': True,
+                                    'border_failures': []}
+            return frequent_itemsets
+
+        lowered_support = self.min_support - error
+        if lowered_support <= 0:
+            raise ValueError(f"The support error {error:.4f} is not smaller than min_support {self.min_support}; "
+                             f"use a larger sample or a smaller error")
+
+        run_stats.config.update(sample_size=sample_size, sample_error=error)
+        rng = np.random.default_rng(random_state)
+        sample = store.take(np.sort(rng.choice(total_transactions, sample_size, replace=False)))
+        logger.info("Mining a sample of %d of %d transactions at support %.4f (error %.4f, confidence %s)",
+                    sample_size, total_transactions, lowered_support, error, confidence)
+
+        min_support = self.min_support
+        self.min_support = lowered_support
+        try:
+            sample_itemsets = {k: itemsets for k, itemsets in self._mine_store(sample).items() if itemsets}
+        finally:
+            self.min_support = min_support
+
+        border_failures = []
+        if verify:
+            with run_stats.phase('verify') as stats:
+                frequent_itemsets, border_failures = self._verify_sample(store, sample_itemsets, stats)
+            self.support_intervals = {itemset: (support, support)
+                                      for itemsets in frequent_itemsets.values()
+                                      for itemset, support in itemsets.items()}
+            if border_failures:
+                logger.warning("%d negative border itemsets are frequent, some frequent supersets may be missing. "
+                               "Rerun with a larger sample.", len(border_failures))
+        else:
+            frequent_itemsets = {}
+            for k, itemsets in sample_itemsets.items():
+                frequent_itemsets[k] = {itemset: support for itemset, support in itemsets.items()
+                                        if support >= self.min_support}
+                for itemset, support in frequent_itemsets[k].items():
+                    self.support_intervals[itemset] = (max(0.0, support - error), min(1.0, support + error))
+
+        self.sampling_report = {'sample_size': sample_size, 'total_transactions': total_transactions,
+                                'error': 0.0 if verify else error, 'confidence': confidence,
+                                'lowered_support': lowered_support, 'verified': verify,
+                                'border_failures': border_failures}
+        return self._store_frequent_itemsets(frequent_itemsets)
+
+    def _verify_sample(self, store: TransactionStore,
+                       sample_itemsets: Dict[int, Dict[frozenset, float]],
+                       stats: PhaseStats = None) -> Tuple[Dict[int, Dict[frozenset, float]], List[frozenset]]:
+        """Count the sampled itemsets and their negative border over all transactions
+
+        Returns the exactly frequent itemsets and the border itemsets among them.
+        """
+        # Negative border: itemsets not frequent in the sample whose every subset is
+        sampled = set()
+        for itemsets in sample_itemsets.values():
+            sampled.update(itemsets)
+        border = {frozenset([item]) for item in store.vocabulary} - sampled
+        for k in range(2, max(sample_itemsets, default=0) + 2):
+            if sample_itemsets.get(k - 1):
+                border.update(self._apriori_gen(sample_itemsets[k - 1], k) - sampled)
+
+        logger.info("Verifying %d sampled itemsets and %d negative border itemsets", len(sampled), len(border))
+        support_counter = make_support_counter(store.encoded, self.support_counting, n_jobs=self.n_jobs)
+        try:
+            counts = self._count_named_itemsets(store, support_counter, sampled | border)
+        finally:
+            support_counter.close()
+
+        min_count = min_support_count(self.min_support, len(store))
+        frequent_itemsets = defaultdict(dict)
+        for itemset, count in counts.items():
+            if count >= min_count:
+                frequent_itemsets[len(itemset)][itemset] = count / len(store)
+        border_failures = [itemset for itemset in border if counts[itemset] >= min_count]
+        if stats is not None:
+            stats.add(support_evaluations=len(counts), negative_border=len(border),
+                      border_failures=len(border_failures))
+
+        return {k: frequent_itemsets[k] for k in sorted(frequent_itemsets)}, border_failures
+
+    def _mine_store(self, store: TransactionStore) -> Dict[int, Dict[frozenset, float]]:
+        """Run the configured algorithm on the item IDs of a store and decode the itemsets"""
+        self._vocabulary = store.vocabulary
+        frequent_ids = self._mine(store.encoded)
+        return {k: {frozenset(store.vocabulary[item] for item in itemset): support
+                    for itemset, support in itemsets.items()}
+                for k, itemsets in frequent_ids.items()}
+
+    def _mine(self, transactions: List[List[int]]) -> Dict[int, Dict[frozenset, float]]:
+        """Run the configured algorithm on encoded transactions"""
+        self._negative_border = {}
+        # Closed and maximal output replace the configured algorithm (and sketches)
+        if self.output == 'closed':
+            miner = Charm(self.min_support)
+        elif self.output == 'maximal':
+            miner = Mafia(self.min_support)
+        elif self.algorithm == 'fpgrowth':
+            miner = FPGrowth(self.min_support)
+        elif self.algorithm in ('eclat', 'declat'):
+            miner = Eclat(self.min_support, use_diffsets=self.algorithm == 'declat')
+        else:
+            return self._find_frequent_itemsets_levelwise(transactions)
+
+        # These miners have no candidate levels, so the whole search is one phase
+        with self.run_stats.phase('mine') as stats:
+            frequent_itemsets = miner.find_frequent_itemsets(transactions)
+            stats.add(frequent=sum(len(itemsets) for itemsets in frequent_itemsets.values()))
+        return frequent_itemsets
+
+    def _store_frequent_itemsets(self, frequent_itemsets: Dict[int, Dict[frozenset, float]]) -> Dict[int, Dict[frozenset, float]]:
+        """Keep the non-empty levels as self.frequent_itemsets and report them"""
+        if not frequent_itemsets:
+            logger.warning("No frequent itemsets found. Try lowering min_support.")
+            self.frequent_itemsets = {}
+            return {}
 
         # Remove empty levels
-        self.frequent_itemsets = {k: v for k, v in self.frequent_itemsets.items() if v}
+        self.frequent_itemsets = {k: v for k, v in frequent_itemsets.items() if v}
+        self._closed_index = None
 
-        total_itemsets = sum(len(itemsets) for itemsets in self.frequent_itemsets.values())
-        print(f"Total frequent itemsets found: {total_itemsets}")
+        if logger.isEnabledFor(logging.INFO):
+            total_itemsets = sum(len(itemsets) for itemsets in self.frequent_itemsets.values())
+            logger.info("Total frequent itemsets found: %d", total_itemsets)
 
-        # Debug: print all found itemsets
-        for k, itemsets in self.frequent_itemsets.items():
-            print(f"\n{k}-itemsets (showing first 10):")
-            for itemset, support in list(itemsets.items())[:10]:
-                print(f"  {set(itemset)}: {support:.4f}")
+        if logger.isEnabledFor(logging.DEBUG):
+            for k, itemsets in self.frequent_itemsets.items():
+                logger.debug("%d-itemsets (showing first 10):", k)
+                for itemset, support in islice(itemsets.items(), 10):
+                    logger.debug("  %s: %.4f", set(itemset), support)
 
         return self.frequent_itemsets
 
-    def generate_rules(self, transactions: List[List[str]]) -> List[Dict[str, Any]]:
-        """Generate association rules from frequent itemsets"""
-        print("Generating association rules...")
-        print(f"Min confidence: {self.min_confidence}")
+    def _find_frequent_itemsets_levelwise(self, transactions: EncodedTransactions) -> Dict[int, Dict[frozenset, float]]:
+        """Find all frequent itemsets level by level (candidate generation and support counting)"""
+        frequent_itemsets = {}
 
-        if not self.frequent_itemsets:
-            print("No frequent itemsets found. Running Apriori first...")
+        support_counter = make_support_counter(transactions, self.support_counting, n_jobs=self.n_jobs)
+        logger.info("Support counting backend: %s", support_counter.name)
+        total_transactions = len(transactions)
+
+        try:
+            # Find frequent 1-itemsets (and 2-itemsets, when sketches count both in one pass)
+            if self.sketch is None:
+                with self.run_stats.phase('level 1') as stats:
+                    frequent_itemsets[1] = self._get_frequent_1_itemsets(transactions)
+                    stats.add(support_evaluations=transactions.n_items, frequent=len(frequent_itemsets[1]))
+            else:
+                with self.run_stats.phase('level 1-2 (sketch)') as stats:
+                    survivors = self._sketch_frequent_1_2_itemsets(transactions)
+                    stats.add(candidates=len(survivors[1]) + len(survivors[2]))
+                with self.run_stats.phase('level 1-2 (exact)') as stats:
+                    frequent_itemsets.update(self._count_sketch_survivors(survivors, support_counter,
+                                                                          total_transactions, stats))
+
+            if not frequent_itemsets[1]:
+                return {}
+
+            k = len(frequent_itemsets) + 1
+            while frequent_itemsets[k - 1]:
+                logger.info("Generating %d-itemsets...", k)
+                with self.run_stats.phase(f'level {k}') as stats:
+                    candidates = self._apriori_gen(frequent_itemsets[k - 1], k, stats)
+                    frequent_k = {}
+
+                    for candidate, count in support_counter.count_many(candidates).items():
+                        support = count / total_transactions
+                        if support >= self.min_support:
+                            frequent_k[candidate] = support
+                        else:
+                            self._negative_border[candidate] = count
+
+                    stats.add(support_evaluations=len(candidates), frequent=len(frequent_k))
+                frequent_itemsets[k] = frequent_k
+                logger.info("Found %d frequent %d-itemsets", len(frequent_k), k)
+
+                if not frequent_k:
+                    break
+                k += 1
+        finally:
+            support_counter.close()
+
+        return frequent_itemsets
+
+    def generate_rules(self, transactions: List[List[str]] = None) -> RuleSet:
+        """Generate association rules from frequent itemsets
+
+        Without ``transactions`` the rules are derived from the itemsets of the
+        last run over its transaction count, so results of an out-of-core run
+        (find_frequent_itemsets_son) need no transactions in memory.
+        """
+        logger.info("Generating association rules...")
+        logger.info("Min confidence: %s", self.min_confidence)
+
+        if not self.frequent_itemsets and transactions is not None:
+            logger.info("No frequent itemsets found. Running Apriori first...")
             self.find_frequent_itemsets(transactions)
 
         if not self.frequent_itemsets:
-            print("Still no frequent itemsets after running Apriori.")
-            return []
+            logger.warning("Still no frequent itemsets after running Apriori.")
+            self.association_rules = RuleSet.from_rules([])
+            return self.association_rules
+
+        total_transactions = len(transactions) if transactions is not None else self._total_transactions
+        return self._derive_rules(total_transactions)
 
+    def _derive_rules(self, total_transactions: int) -> RuleSet:
+        """Generate the confident rules of self.frequent_itemsets over ``total_transactions`` transactions"""
         rules = []
-        total_transactions = len(transactions)
+        self._confidence_evaluations = 0
 
-        rule_count = 0
-        for k, itemsets in self.frequent_itemsets.items():
-            if k < 2:  # Need at least 2 items to form a rule
-                continue
+        with self.run_stats.phase('rules', replace=True) as stats:
+            # Every subset of a frequent itemset is itself frequent, so antecedent and consequent
+            # counts come straight from the mined supports instead of rescanning the transactions
+            support_counts = self._build_support_counts(total_transactions)
+            if self.output != 'all':
+                # Closed and maximal itemsets leave out subsets that rules need, recover their supports
+                subsets = {frozenset(subset)
+                           for k, itemsets in self.frequent_itemsets.items() if k >= 2
+                           for itemset in itemsets
+                           for size in range(1, k)
+                           for subset in combinations(itemset, size)}
+                subsets.difference_update(support_counts)
+                stats.add(support_lookups=len(subsets))
+                for itemset, support in self.get_supports(subsets).items():
+                    support_counts[itemset] = round(support * total_transactions)
+
+            rule_count = 0
+            for k, itemsets in self.frequent_itemsets.items():
+                if k < 2:  # Need at least 2 items to form a rule
+                    continue
+
+                logger.info("Generating rules from %d-itemsets...", k)
+                for itemset, support in itemsets.items():
+                    itemset_rules = self._generate_itemset_rules(itemset, support, support_counts, total_transactions)
+                    rules.extend(itemset_rules)
+                    rule_count += len(itemset_rules)
+                stats.add(itemsets=len(itemsets))
+
+            logger.info("Generated %d candidate rules before confidence filtering", rule_count)
 
-            print(f"Generating rules from {k}-itemsets...")
-            for itemset, support in itemsets.items():
-                itemset_list = list(itemset)
-
-                # Generate all possible rules
-                for i in range(1, len(itemset_list)):
-                    for antecedent in combinations(itemset_list, i):
-                        antecedent = frozenset(antecedent)
-                        consequent = itemset - antecedent
-
-                        if not consequent:  # Skip if consequent is empty
-                            continue
-
-                        # Calculate confidence
-                        antecedent_count = sum(1 for transaction in transactions
-                                               if antecedent.issubset(set(transaction)))
-                        if antecedent_count == 0:
-                            continue
-
-                        confidence = (support * total_transactions) / antecedent_count
-
-                        if confidence >= self.min_confidence:
-                            # Calculate lift
-                            consequent_count = sum(1 for transaction in transactions
-                                                   if consequent.issubset(set(transaction)))
-                            consequent_support = consequent_count / total_transactions
-
-                            if consequent_support > 0:
-                                lift = confidence / consequent_support
-                            else:
-                                lift = float('inf')
-
-                            # Calculate conviction
-                            if confidence == 1:
-                                conviction = float('inf')
-                            else:
-                                conviction = (1 - consequent_support) / (1 - confidence)
-
-                            rules.append({
-                                'antecedent': set(antecedent),
-                                'consequent': set(consequent),
-                                'support': support,
-                                'confidence': confidence,
-                                'lift': lift,
-                                'conviction': conviction
-                            })
-                            rule_count += 1
-
-        print(f"Generated {rule_count} candidate rules before confidence filtering")
-
-        # Sort rules by confidence (descending)
-        rules.sort(key=lambda x: x['confidence'], reverse=True)
+            # Metric columns, sorted by confidence (descending)
+            columns = list(zip(*rules)) if rules else [[]] * (2 + len(RULE_METRICS))
+            rules = RuleSet(list(columns[0]), list(columns[1]),
+                            dict(zip(RULE_METRICS, columns[2:]))).sorted_by('confidence')
+            stats.add(confidence_evaluations=self._confidence_evaluations, rules=len(rules),
+                      pruned_by_confidence=self._confidence_evaluations - len(rules))
         self.association_rules = rules
 
-        print(f"Final number of association rules: {len(rules)}")
+        logger.info("Final number of association rules: %d", len(rules))
 
-        if rules:
-            print("Top 5 rules:")
-            for i, rule in enumerate(rules[:5]):
-                print(f"  {i + 1}. IF {rule['antecedent']} THEN {rule['consequent']}")
-                print(f"      Support: {rule['support']:.4f}, Confidence: {rule['confidence']:.4f}")
+        if rules and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Top 5 rules:")
+            for i, rule in enumerate(rules.top(5, 'confidence')):
+                logger.debug("  %d. IF %s THEN %s", i + 1, rule['antecedent'], rule['consequent'])
+                logger.debug("      Support: %.4f, Confidence: %.4f", rule['support'], rule['confidence'])
 
         return rules
 
+    def _generate_itemset_rules(self, itemset: frozenset, support: float, support_counts: Dict[frozenset, int],
+                                total_transactions: int) -> List[Tuple]:
+        """Generate the confident rules of one itemset by growing consequents level by level (ap-genrules)
+
+        Confidence can only drop when an item moves from the antecedent to the
+        consequent, so only consequents whose every subset passed are extended.
+        Rules come out in the order of enumerating antecedents with combinations(),
+        as (antecedent, consequent, support, confidence, lift, conviction) tuples.
+        """
+        itemset_list = list(itemset)
+        position = {item: i for i, item in enumerate(itemset_list)}
+
+        itemset_rules = []
+        consequents = [(item,) for item in sorted(itemset_list)]
+        consequent_size = 1
+
+        while consequents and consequent_size < len(itemset_list):
+            confident_consequents = []
+            self._confidence_evaluations += len(consequents)
+
+            for consequent_items in consequents:
+                consequent_items = frozenset(consequent_items)
+                antecedent = frozenset(item for item in itemset_list if item not in consequent_items)
+                consequent = itemset - antecedent
+
+                # Calculate confidence
+                antecedent_count = support_counts.get(antecedent, 0)
+                if antecedent_count == 0:
+                    continue
+
+                confidence = (support * total_transactions) / antecedent_count
+
+                if confidence < self.min_confidence:
+                    continue
+                confident_consequents.append(tuple(sorted(consequent_items)))
+
+                # Calculate lift
+                consequent_support = support_counts.get(consequent, 0) / total_transactions
+
+                if consequent_support > 0:
+                    lift = confidence / consequent_support
+                else:
+                    lift = float('inf')
+
+                # Calculate conviction
+                if confidence == 1:
+                    conviction = float('inf')
+                else:
+                    conviction = (1 - consequent_support) / (1 - confidence)
+
+                sort_key = (len(antecedent), sorted(position[item] for item in antecedent))
+                itemset_rules.append((sort_key, (set(antecedent), set(consequent), support,
+                                                 confidence, lift, conviction)))
+
+            # Grow consequents by one item, keeping only those whose subsets were all confident
+            confident_set = set(confident_consequents)
+            consequents = [candidate for candidate in join_by_prefix(sorted(confident_consequents))
+                           if all(candidate[:i] + candidate[i + 1:] in confident_set
+                                  for i in range(len(candidate)))]
+            consequent_size += 1
+
+        itemset_rules.sort(key=lambda entry: entry[0])
+        return [rule for _, rule in itemset_rules]
+
+    def get_support(self, itemset: Iterable[str]) -> float:
+        """Support of any itemset over the last mined transactions"""
+        itemset = frozenset(itemset)
+        return self.get_supports([itemset])[itemset]
+
+    def get_supports(self, itemsets: Iterable[Iterable[str]]) -> Dict[frozenset, float]:
+        """Supports of any itemsets over the last mined transactions
+
+        Mined itemsets are looked up. With output='closed' the support of a subset
+        is that of its closed supersets; everything else, such as the subsets of
+        maximal itemsets, is counted over the mined transactions in one batch.
+        """
+        supports = {}
+        missing = []
+        for itemset in map(frozenset, itemsets):
+            support = self.frequent_itemsets.get(len(itemset), {}).get(itemset)
+            if support is None and self.output == 'closed':
+                support = self._closed_superset_support(itemset)
+            if support is None:
+                missing.append(itemset)
+            else:
+                supports[itemset] = support
+
+        if missing:
+            if not self._history:
+                raise ValueError(f"Support of {set(missing[0])} is unknown: the transactions of the last run "
+                                 f"were not kept (use find_frequent_itemsets)")
+            for itemset, count in self._count_history(missing).items():
+                supports[itemset] = count / self._total_transactions
+
+        return supports
+
+    def _closed_superset_support(self, itemset: frozenset) -> float:
+        """Largest support among the closed itemsets containing ``itemset``, None if there is none"""
+        if self._closed_index is None:
+            closed = [(closed_itemset, support)
+                      for itemsets in self.frequent_itemsets.values()
+                      for closed_itemset, support in itemsets.items()]
+            index = defaultdict(int)
+            for i, (closed_itemset, _) in enumerate(closed):
+                for item in closed_itemset:
+                    index[item] |= 1 << i
+            self._closed_index = (closed, index)
+
+        closed, index = self._closed_index
+        supersets = -1
+        for item in itemset:
+            supersets &= index.get(item, 0)
+        if not itemset or not supersets:
+            return None
+
+        best = None
+        while supersets:
+            lowest = supersets & -supersets
+            support = closed[lowest.bit_length() - 1][1]
+            if best is None or support > best:
+                best = support
+            supersets ^= lowest
+        return best
+
+    def _build_support_counts(self, total_transactions: int) -> Dict[frozenset, int]:
+        """Map every mined itemset to its transaction count for O(1) lookups"""
+        return {itemset: round(support * total_transactions)
+                for itemsets in self.frequent_itemsets.values()
+                for itemset, support in itemsets.items()}
+
     def get_rules_dataframe(self) -> pd.DataFrame:
         """Convert association rules to pandas DataFrame"""
         if not self.association_rules:
-            print("No association rules to convert to DataFrame")
+            logger.warning("No association rules to convert to DataFrame")
             return pd.DataFrame()
 
-        data = []
-        for rule in self.association_rules:
-            data.append({
-                'Antecedent': ' & '.join(rule['antecedent']),
-                'Consequent': ' & '.join(rule['consequent']),
-                'Support': f"{rule['support']:.4f}",
-                'Confidence': f"{rule['confidence']:.4f}",
-                'Lift': f"{rule['lift']:.4f}",
-                'Conviction': f"{rule['conviction']:.4f}" if rule['conviction'] != float('inf') else 'inf'
+        rules = self._rule_set()
+        return pd.DataFrame({
+            'Antecedent': [' & '.join(antecedent) for antecedent in rules.antecedents],
+            'Consequent': [' & '.join(consequent) for consequent in rules.consequents],
+            'Support': [f"{value:.4f}" for value in rules.column('support').tolist()],
+            'Confidence': [f"{value:.4f}" for value in rules.column('confidence').tolist()],
+            'Lift': [f"{value:.4f}" for value in rules.column('lift').tolist()],
+            'Conviction': [f"{value:.4f}" if value != float('inf') else 'inf'
+                           for value in rules.column('conviction').tolist()]
+        })
+
+    def top_k_rules(self, transactions: Union[TransactionStore, List[List[str]]], k: int = 100,
+                    metric: str = 'confidence', min_count: int = 10,
+                    min_confidence: float = 0.0) -> RuleSet:
+        """Find the k best rules by support, confidence or lift in one search, without min_support
+
+        The threshold rises to the k-th best value while mining (see TopKRules).
+        Rules seen in fewer than ``min_count`` transactions are ignored, so that
+        rare coincidences don't crowd out the top rules by confidence or lift.
+        The rules replace self.association_rules, best first.
+        """
+        logger.info("Finding the top %d rules by %s (min_count %d)...", k, metric, min_count)
+        store = encode_transactions(transactions)
+        total_transactions = len(store)
+        run_stats = self._new_run_stats('top_k', transactions=total_transactions, k=k, metric=metric,
+                                        min_count=min_count)
+
+        rules = []
+        miner = TopKRules(k, metric, min_count=min_count, min_confidence=min_confidence)
+        with run_stats.phase('top_k_rules') as stats:
+            found = miner.find_rules(store.encoded)
+            stats.add(rules=len(found))
+        for antecedent, consequent, rule_count, antecedent_count, consequent_count in found:
+            confidence = rule_count / antecedent_count
+            consequent_support = consequent_count / total_transactions
+            rules.append({
+                'antecedent': set(store.decode(antecedent)),
+                'consequent': set(store.decode(consequent)),
+                'support': rule_count / total_transactions,
+                'confidence': confidence,
+                'lift': confidence / consequent_support,
+                'conviction': float('inf') if confidence == 1 else (1 - consequent_support) / (1 - confidence)
             })
 
-        return pd.DataFrame(data)
+        self.association_rules = RuleSet.from_rules(rules)
+        logger.info("Found %d rules", len(rules))
+        return self.association_rules
 
     def get_top_rules(self, n: int = 10, metric: str = 'confidence') -> List[Dict]:
         """Get top N rules based on specified metric"""
         if not self.association_rules:
             return []
 
-        if metric not in ['support', 'confidence', 'lift', 'conviction']:
+        if metric not in RULE_METRICS:
             metric = 'confidence'
 
-        sorted_rules = sorted(self.association_rules, key=lambda x: x[metric], reverse=True)
-        return sorted_rules[:n]
\ No newline at end of file
+        return self._rule_set().top(n, metric)
+
+    def _rule_set(self) -> RuleSet:
+        """self.association_rules as a RuleSet, converting a plain list of rule dicts once"""
+        if not isinstance(self.association_rules, RuleSet):
+            self.association_rules = RuleSet.from_rules(self.association_rules)
+        return self.association_rules
\ No newline at end of file
@@ -0,0 +1,86 @@
+from typing import List, Dict, Hashable, Tuple
+from collections import defaultdict
+
+try:
+    from .support_counting import item_bitmaps, min_support_count, _popcount
+except ImportError:
+    from support_counting import item_bitmaps, min_support_count, _popcount
+
+
+class Charm:
+    """Closed frequent itemset mining over tidset bitmaps (CHARM)
+
+    The search walks itemset-tidset pairs depth-first like Eclat, but folds
+    items whose tidsets contain the current node's tidset into its itemset
+    instead of branching on them, so non-closed itemsets are never expanded.
+    An itemset is kept only if no itemset with the same tidset was found.
+    """
+
+    def __init__(self, min_support: float = 0.01):
+        self.min_support = min_support
+
+    def find_frequent_itemsets(self, transactions: List[List[Hashable]]) -> Dict[int, Dict[frozenset, float]]:
+        """Find the closed frequent itemsets, grouped by size like Apriori.find_frequent_itemsets"""
+        total_transactions = len(transactions)
+        if not total_transactions:
+            return {}
+
+        min_count = min_support_count(self.min_support, total_transactions)
+        bitmaps = item_bitmaps(transactions)
+
+        nodes = [((item,), tids, _popcount(tids)) for item, tids in bitmaps.items()]
+        nodes = [node for node in nodes if node[2] >= min_count]
+        # Least frequent first: rarer items are folded into more frequent ones, not the other way round
+        nodes.sort(key=lambda node: (node[2], node[0]))
+
+        # tidset -> closed itemset with exactly those transactions
+        closed = {}
+        self._extend(frozenset(), nodes, min_count, closed)
+
+        frequent_itemsets = defaultdict(dict)
+        for tids, itemset in closed.items():
+            frequent_itemsets[len(itemset)][itemset] = _popcount(tids) / total_transactions
+
+        return {k: frequent_itemsets[k] for k in sorted(frequent_itemsets)}
+
+    def _extend(self, prefix: frozenset, nodes: List[Tuple], min_count: int, closed: Dict[int, frozenset]):
+        """Grow every node of one equivalence class, ``nodes`` holding (items beyond prefix, tidset, count)"""
+        removed = set()
+        for i, (items, tids, count) in enumerate(nodes):
+            if i in removed:
+                continue
+            itemset = set(prefix)
+            itemset.update(items)
+            children = []
+
+            for j in range(i + 1, len(nodes)):
+                if j in removed:
+                    continue
+                other_items, other_tids, other_count = nodes[j]
+                joined = tids & other_tids
+                joined_count = _popcount(joined)
+                if joined_count < min_count:
+                    continue
+
+                if joined_count == count and joined_count == other_count:
+                    # Same tidsets: both always occur together, the other node is absorbed
+                    itemset.update(other_items)
+                    removed.add(j)
+                elif joined_count == count:
+                    # t(X) inside t(Y): Y occurs wherever X does
+                    itemset.update(other_items)
+                elif joined_count == other_count:
+                    # t(Y) inside t(X): XY replaces Y, which can't be closed on its own here
+                    removed.add(j)
+                    children.append((other_items, joined, joined_count))
+                else:
+                    children.append((other_items, joined, joined_count))
+
+            itemset = frozenset(itemset)
+            if children:
+                children.sort(key=lambda node: node[2])
+                self._extend(itemset, children, min_count, closed)
+
+            # Subsumption check: a closed itemset was already found with the same transactions
+            existing = closed.get(tids)
+            closed[tids] = itemset if existing is None else existing | itemset
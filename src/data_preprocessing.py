@@ -1,6 +1,35 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import logging
 import pandas as pd
 import numpy as np
-from typing import List, Tuple, Dict, Any
+from math import ceil
+from typing import List, Tuple, Dict, Any, Iterator
+
+try:
+    from .transaction_store import TransactionStore
+    from .sketches import make_sketch
+except ImportError:
+    from transaction_store import TransactionStore
+    from sketches import make_sketch
+
+logger = logging.getLogger(__name__)
+
+# Explicit dtypes for the columns of the groceries export, used when streaming CSV files
+CSV_DTYPES = {
+    'Member_number': 'int64',
+    'itemDescription': 'category',
+}
+DATE_COLUMNS = ['Date']
+
+# Prepared transactions are cached here, one directory per source file hash and options
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'processed')
+
+# Bump when the cached layout or the preprocessing changes, so old cache entries are not reused
+CACHE_FORMAT_VERSION = 1
 
 
 class DataPreprocessor:
@@ -18,16 +47,16 @@ class DataPreprocessor:
                 # If it's a file path
                 self.data = pd.read_csv(file_path)
 
-            print(f"Dataset loaded successfully with {len(self.data)} rows and {len(self.data.columns)} columns")
+            logger.info("Dataset loaded successfully with %d rows and %d columns", len(self.data), len(self.data.columns))
             return self.data
         except Exception as e:
-            print(f"Error loading dataset: {e}")
+            logger.error("Error loading dataset: %s", e)
             return None
 
     def explore_data(self) -> Dict[str, Any]:
         """Explore basic information about the dataset"""
         if self.data is None:
-            print("No data loaded")
+            logger.warning("No data loaded")
             return {}
 
         info = {
@@ -40,95 +69,348 @@ class DataPreprocessor:
             'describe': self.data.describe(include='all')
         }
 
-        print("=== Dataset Information ===")
-        print(f"Shape: {info['shape']}")
-        print(f"Columns: {info['columns']}")
-        print(f"Memory usage: {info['memory_usage']} bytes")
-        print("\n=== Data Types ===")
-        print(info['data_types'])
-        print("\n=== Missing Values ===")
-        print(info['missing_values'])
+        logger.info("=== Dataset Information ===")
+        logger.info("Shape: %s", info['shape'])
+        logger.info("Columns: %s", info['columns'])
+        logger.info("Memory usage: %d bytes", info['memory_usage'])
+        logger.info("=== Data Types ===\n%s", info['data_types'])
+        logger.info("=== Missing Values ===\n%s", info['missing_values'])
 
         return info
 
-    def prepare_transactions(self) -> List[List[str]]:
-        """Prepare transactions in the format required for Apriori"""
+    def prepare_transactions(self) -> TransactionStore:
+        """Prepare transactions in the format required for Apriori
+
+        Transactions come back as a TransactionStore: items are encoded as
+        integer IDs and each transaction is deduplicated and sorted.
+        """
         if self.data is None:
-            print("No data loaded")
-            return []
+            logger.warning("No data loaded")
+            return TransactionStore.from_transactions([])
 
         # Check if required columns exist
         if 'itemDescription' not in self.data.columns:
-            print("Error: 'itemDescription' column not found in dataset")
-            print(f"Available columns: {self.data.columns.tolist()}")
-            return []
-
-        # Clean the item descriptions
-        self.data['itemDescription'] = self.data['itemDescription'].str.strip().str.lower()
+            logger.error("'itemDescription' column not found in dataset. Available columns: %s",
+                         self.data.columns.tolist())
+            return TransactionStore.from_transactions([])
 
-        # Group items by transaction
-        transaction_column = None
+        # Clean the item descriptions (on the distinct values only)
+        self.data['itemDescription'] = self._clean_item_categories(self.data['itemDescription'])
 
         # Try to find transaction identifier
-        if 'Member_number' in self.data.columns and 'Date' in self.data.columns:
-            # Create transaction ID from Member_number and Date
-            self.data['Transaction_ID'] = self.data['Member_number'].astype(str) + '_' + self.data['Date']
-            transaction_column = 'Transaction_ID'
-            print("Using Member_number + Date as transaction identifier")
-        elif 'Transaction' in self.data.columns:
-            transaction_column = 'Transaction'
-            print("Using Transaction column as transaction identifier")
+        key_columns = self._transaction_key_columns(self.data.columns)
+        if key_columns == ['Member_number', 'Date']:
+            logger.info("Using Member_number + Date as transaction identifier")
+        elif key_columns:
+            logger.info("Using Transaction column as transaction identifier")
         else:
             # If no transaction ID, assume each row is a separate transaction
-            print("Warning: No transaction identifier found. Using each row as a separate transaction.")
-            transactions = [[item] for item in self.data['itemDescription'].values]
-            self.transactions = transactions
-            print(f"Created {len(transactions)} single-item transactions")
-            return transactions
+            logger.warning("No transaction identifier found. Using each row as a separate transaction.")
+            self.transactions = self._build_store(self.data, key_columns, min_rows=1)
+            logger.info("Created %d single-item transactions", len(self.transactions))
+            return self.transactions
 
-        # Group by transaction
-        transactions = self.data.groupby(transaction_column)['itemDescription'].apply(list).tolist()
+        n_transactions = self.data.groupby(key_columns, sort=False, dropna=False).ngroups
 
-        # Filter out transactions with only one item (they can't generate rules)
-        multi_item_transactions = [t for t in transactions if len(t) > 1]
+        # Filter out transactions with only one item (they can't generate rules).
+        # Rows are counted before items are deduplicated, as they always have been.
+        self.transactions = self._build_store(self.data, key_columns, min_rows=2)
 
-        print(f"Original transactions: {len(transactions)}")
-        print(f"Multi-item transactions (can generate rules): {len(multi_item_transactions)}")
+        logger.info("Original transactions: %d", n_transactions)
+        logger.info("Multi-item transactions (can generate rules): %d", len(self.transactions))
 
-        if len(multi_item_transactions) < len(transactions):
-            print(f"Filtered out {len(transactions) - len(multi_item_transactions)} single-item transactions")
+        if len(self.transactions) < n_transactions:
+            logger.info("Filtered out %d single-item transactions", n_transactions - len(self.transactions))
 
-        self.transactions = multi_item_transactions
+        logger.info("Encoded %d distinct items (%d bytes)", self.transactions.n_items, self.transactions.nbytes)
 
-        # Print transaction statistics
-        if self.transactions:
-            transaction_lengths = [len(t) for t in self.transactions]
-            print(f"Average items per transaction: {np.mean(transaction_lengths):.2f}")
-            print(f"Max items per transaction: {max(transaction_lengths)}")
-            print(f"Min items per transaction: {min(transaction_lengths)}")
-            print(f"Sample transactions:")
+        # Transaction statistics
+        if self.transactions and logger.isEnabledFor(logging.INFO):
+            transaction_lengths = self.transactions.lengths()
+            logger.info("Average items per transaction: %.2f", np.mean(transaction_lengths))
+            logger.info("Max items per transaction: %d", transaction_lengths.max())
+            logger.info("Min items per transaction: %d", transaction_lengths.min())
+        if self.transactions and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sample transactions:")
             for i, transaction in enumerate(self.transactions[:3]):
-                print(f"  Transaction {i + 1}: {transaction}")
+                logger.debug("  Transaction %d: %s", i + 1, transaction)
 
         return self.transactions
 
+    def load_transactions(self, file_path: str, cache_dir: str = DEFAULT_CACHE_DIR,
+                          clean: bool = False) -> TransactionStore:
+        """Prepare transactions from a CSV file, reusing a cached copy when the input is unchanged
+
+        The encoded store and its vocabulary are cached in ``cache_dir`` under a
+        hash of the file contents and the preprocessing options. A cache hit
+        memory-maps the arrays and skips parsing and grouping entirely (``data``
+        is then left unloaded). The returned store is always the memory-mapped
+        cached copy, so worker processes can share it read-only. ``file_path``
+        may also be a file-like object.
+        """
+        cache_key = self._cache_key(file_path, {'clean': clean})
+        cache_path = os.path.join(cache_dir, f"transactions_{cache_key}")
+
+        if os.path.exists(os.path.join(cache_path, 'vocabulary.json')):
+            self.transactions = TransactionStore.load(cache_path)
+            logger.info("Loaded %d cached transactions from %s", len(self.transactions), cache_path)
+            return self.transactions
+
+        if self.load_data(file_path) is None:
+            return TransactionStore.from_transactions([])
+        if clean:
+            self.clean_data()
+        transactions = self.prepare_transactions()
+
+        if transactions:
+            # Write to a scratch directory first so readers never see a partial entry
+            os.makedirs(cache_dir, exist_ok=True)
+            scratch_path = tempfile.mkdtemp(dir=cache_dir)
+            transactions.save(scratch_path)
+            try:
+                os.replace(scratch_path, cache_path)
+                logger.info("Cached prepared transactions in %s", cache_path)
+            except OSError:
+                # Another run cached the same input first
+                shutil.rmtree(scratch_path, ignore_errors=True)
+            # Continue from the memory-mapped copy so the in-memory arrays can be released
+            # and support counting can use the on-disk bitmaps next to it
+            self.transactions = transactions = TransactionStore.load(cache_path)
+
+        return transactions
+
+    @staticmethod
+    def _cache_key(file_path, options: Dict[str, Any]) -> str:
+        """Hash the source contents together with the preprocessing options"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps({'version': CACHE_FORMAT_VERSION, **options}, sort_keys=True).encode())
+
+        if hasattr(file_path, 'read'):
+            # File-like object (Streamlit upload): hash its bytes, then rewind it for parsing
+            position = file_path.tell()
+            while True:
+                block = file_path.read(1024 * 1024)
+                if not block:
+                    break
+                digest.update(block if isinstance(block, bytes) else block.encode())
+            file_path.seek(position)
+        else:
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+
+        return digest.hexdigest()[:32]
+
+    def iter_transaction_chunks(self, file_path: str, chunksize: int = 100000) -> Iterator[TransactionStore]:
+        """Yield the transactions of a CSV file as one TransactionStore per partition, without loading the whole file
+
+        Rows are first spread over temporary partition files by a hash of their
+        transaction key (Member_number + Date, or Transaction), so every
+        transaction ends up complete in exactly one partition of roughly
+        ``chunksize`` rows. Items are cleaned and grouped as in prepare_transactions.
+        """
+        with tempfile.TemporaryDirectory() as spill_dir:
+            partition_paths = []
+            key_columns = None
+
+            for chunk in self._read_csv_chunks(file_path, chunksize):
+                if key_columns is None:
+                    key_columns = self._transaction_key_columns(chunk.columns)
+
+                    # Size the partitions so each holds about one chunk of rows
+                    if len(chunk) < chunksize:
+                        n_partitions = 1
+                    else:
+                        chunk_bytes = len(chunk.to_csv(index=False).encode())
+                        n_partitions = max(1, ceil(os.path.getsize(file_path) / chunk_bytes))
+                    partition_paths = [os.path.join(spill_dir, f"partition_{i}.csv") for i in range(n_partitions)]
+
+                if key_columns:
+                    partition_ids = pd.util.hash_pandas_object(chunk[key_columns], index=False) % len(partition_paths)
+                else:
+                    # Every row is its own transaction, any partition will do
+                    partition_ids = pd.Series(np.arange(len(chunk)) % len(partition_paths), index=chunk.index)
+
+                for partition_id, rows in chunk.groupby(partition_ids.values):
+                    path = partition_paths[partition_id]
+                    rows.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+            for path in partition_paths:
+                if not os.path.exists(path):
+                    continue
+                # Spilled dates are written back in ISO format
+                partition = next(self._read_csv_chunks(path, chunksize=None, dayfirst=False))
+                # Same filter as prepare_transactions: single-item transactions can't generate rules
+                yield self._build_store(partition, key_columns, min_rows=2 if key_columns else 1)
+
+    def stream_transactions(self, file_path: str, chunksize: int = 100000) -> Iterator[List[str]]:
+        """Yield the transactions of a CSV file one at a time; peak memory follows chunksize, not file size"""
+        for transactions in self.iter_transaction_chunks(file_path, chunksize):
+            yield from transactions
+
+    def iter_dated_transactions(self, file_path: str,
+                                chunksize: int = 100000) -> Iterator[Tuple[pd.Timestamp, List[str]]]:
+        """Yield (date, items) for every transaction of a CSV file in date order, for SlidingWindowMiner
+
+        Transactions are grouped and filtered as in prepare_transactions; a
+        transaction spanning several dates is dated by its first one. The file is
+        read in chunks twice: first to count rows per date, then to spread the
+        rows over temporary files holding consecutive date ranges of about
+        ``chunksize`` rows, which are sorted and yielded one at a time.
+        """
+        # Pass 1: rows per date, and the first date of every 'Transaction' that may span several
+        date_counts = None
+        first_dates = None
+        first_chunk, n_chunks = None, 0
+        for chunk in self._read_csv_chunks(file_path, chunksize):
+            if 'Date' not in chunk.columns:
+                raise ValueError("A 'Date' column is required to order transactions in time")
+            chunk = chunk.dropna(subset=['Date'])
+            if self._transaction_key_columns(chunk.columns) == ['Transaction']:
+                chunk_first_dates = chunk.groupby('Transaction', observed=True)['Date'].min()
+                first_dates = chunk_first_dates if first_dates is None else \
+                    pd.concat([first_dates, chunk_first_dates]).groupby(level=0).min()
+            counts = chunk['Date'].value_counts()
+            date_counts = counts if date_counts is None else date_counts.add(counts, fill_value=0)
+            if not n_chunks:
+                first_chunk = chunk
+            n_chunks += 1
+
+        if date_counts is None or not len(date_counts):
+            return
+        if n_chunks == 1:
+            # The whole file fits in one chunk, no need to spill it
+            yield from self._dated_transactions(first_chunk)
+            return
+        first_chunk = None
+
+        # Consecutive date ranges of about chunksize rows; a date is never split
+        date_counts = date_counts.sort_index()
+        partition_of_date = (np.cumsum(date_counts.values) - 1) // chunksize
+        range_starts = date_counts.index.values[np.flatnonzero(np.diff(partition_of_date)) + 1]
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            partition_paths = [os.path.join(spill_dir, f"dates_{i}.csv") for i in range(len(range_starts) + 1)]
+            for chunk in self._read_csv_chunks(file_path, chunksize):
+                chunk = chunk.dropna(subset=['Date'])
+                dates = chunk['Date'] if first_dates is None else chunk['Transaction'].map(first_dates)
+                partition_ids = np.searchsorted(range_starts, dates.values, side='right')
+                for partition_id, rows in chunk.groupby(partition_ids):
+                    path = partition_paths[partition_id]
+                    rows.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+
+            for path in partition_paths:
+                if os.path.exists(path):
+                    # Spilled dates are written back in ISO format
+                    yield from self._dated_transactions(next(self._read_csv_chunks(path, dayfirst=False)))
+
+    def _dated_transactions(self, data: pd.DataFrame) -> Iterator[Tuple[pd.Timestamp, List[str]]]:
+        """(date, items) of the transactions of rows holding whole transactions, in date order"""
+        data = data.sort_values('Date', kind='stable')
+        key_columns = self._transaction_key_columns(data.columns)
+        min_rows = 2 if key_columns else 1
+        store = self._build_store(data, key_columns, min_rows=min_rows)
+
+        if key_columns:
+            # Same first-appearance group order as the store's transactions
+            groups = data.groupby(key_columns, sort=False, dropna=False, observed=True)
+            dates = groups['Date'].min()[(groups.size() >= min_rows).values]
+        else:
+            dates = data['Date']
+
+        yield from zip(dates, store)
+
+    def _read_csv_chunks(self, file_path: str, chunksize: int = None, dayfirst: bool = True) -> Iterator[pd.DataFrame]:
+        """Read a CSV with explicit dtypes and cleaned item descriptions, ``chunksize`` rows at a time
+
+        With ``chunksize=None`` the whole file is yielded as one frame.
+        """
+        columns = pd.read_csv(file_path, nrows=0).columns
+        dtypes = {column: dtype for column, dtype in CSV_DTYPES.items() if column in columns}
+        date_columns = [column for column in DATE_COLUMNS if column in columns]
+
+        reader = pd.read_csv(file_path, dtype=dtypes, parse_dates=date_columns, dayfirst=dayfirst,
+                             chunksize=chunksize)
+        chunks = [reader] if chunksize is None else reader
+
+        for chunk in chunks:
+            if 'itemDescription' in chunk.columns:
+                chunk = chunk.dropna(subset=['itemDescription'])
+                chunk['itemDescription'] = self._clean_item_categories(chunk['itemDescription'])
+            yield chunk
+
+    @staticmethod
+    def _build_store(data: pd.DataFrame, key_columns: List[str], min_rows: int) -> TransactionStore:
+        """Group rows into an encoded TransactionStore with integer keys, no per-row Python objects"""
+        items = data['itemDescription']
+        if not isinstance(items.dtype, pd.CategoricalDtype):
+            items = items.astype('category')
+
+        if key_columns:
+            transaction_codes = data.groupby(key_columns, sort=False, dropna=False, observed=True).ngroup().values
+        else:
+            transaction_codes = np.arange(len(data))
+
+        return TransactionStore.from_codes(transaction_codes, items.cat.codes.values,
+                                           list(items.cat.categories), min_rows=min_rows)
+
+    @staticmethod
+    def _clean_item_categories(items: pd.Series) -> pd.Categorical:
+        """Strip and lowercase a categorical item column by cleaning its categories only"""
+        items = items.astype('category')
+        cleaned = items.cat.categories.astype(str).str.strip().str.lower()
+        # Cleaning can merge categories ("Milk " and "milk"), so remap the codes
+        categories, inverse = np.unique(np.asarray(cleaned), return_inverse=True)
+        codes = items.cat.codes.values
+        return pd.Categorical.from_codes(np.where(codes >= 0, inverse[codes], -1), categories=categories)
+
+    @staticmethod
+    def _transaction_key_columns(columns) -> List[str]:
+        """Columns identifying a transaction, or an empty list if every row is its own transaction"""
+        if 'Member_number' in columns and 'Date' in columns:
+            return ['Member_number', 'Date']
+        if 'Transaction' in columns:
+            return ['Transaction']
+        return []
+
     def get_frequent_items(self, top_n: int = 20) -> pd.Series:
         """Get the most frequent items in the dataset"""
         if self.data is None:
-            print("No data loaded")
+            logger.warning("No data loaded")
             return pd.Series()
 
         if 'itemDescription' not in self.data.columns:
-            print("Error: 'itemDescription' column not found")
+            logger.error("'itemDescription' column not found")
             return pd.Series()
 
         item_counts = self.data['itemDescription'].value_counts().head(top_n)
         return item_counts
 
+    def sketch_frequent_items(self, file_path: str, top_n: int = 20, method: str = 'spacesaving',
+                              error: float = 0.001, chunksize: int = 100000) -> pd.Series:
+        """Estimate the most frequent items of a CSV file in one pass with a fixed-memory sketch
+
+        Like get_frequent_items this counts rows. Counts are upper bounds, at most
+        ``error`` times the number of rows too high; the bound is in ``series.attrs['error_bound']``.
+        """
+        if method not in ('lossy', 'spacesaving'):
+            raise ValueError("Only the 'lossy' and 'spacesaving' sketches keep the items they count")
+
+        sketch = make_sketch(method, error)
+        for chunk in self._read_csv_chunks(file_path, chunksize):
+            for item, count in chunk['itemDescription'].value_counts().items():
+                if count:
+                    sketch.add(item, int(count))
+
+        item_counts = pd.Series(sketch.frequent(0), name='count', dtype='int64')
+        item_counts = item_counts.sort_values(ascending=False, kind='stable').head(top_n)
+        item_counts.attrs['error_bound'] = sketch.error_bound()
+        return item_counts
+
     def clean_data(self) -> pd.DataFrame:
         """Clean the dataset by handling missing values and duplicates"""
         if self.data is None:
-            print("No data loaded")
+            logger.warning("No data loaded")
             return pd.DataFrame()
 
         initial_count = len(self.data)
@@ -136,14 +418,14 @@ class DataPreprocessor:
         # Remove duplicates
         self.data = self.data.drop_duplicates()
         after_dedup = len(self.data)
-        print(f"Removed {initial_count - after_dedup} duplicate rows")
+        logger.info("Removed %d duplicate rows", initial_count - after_dedup)
 
         # Handle missing values in itemDescription
         if self.data['itemDescription'].isnull().sum() > 0:
             before_null = len(self.data)
             self.data = self.data.dropna(subset=['itemDescription'])
             after_null = len(self.data)
-            print(f"Removed {before_null - after_null} rows with missing item descriptions")
+            logger.info("Removed %d rows with missing item descriptions", before_null - after_null)
 
         # Clean item descriptions
         self.data['itemDescription'] = self.data['itemDescription'].str.strip().str.lower()
@@ -153,17 +435,17 @@ class DataPreprocessor:
     def analyze_transaction_patterns(self):
         """Analyze transaction patterns for better parameter tuning"""
         if self.transactions is None:
-            print("No transactions prepared")
+            logger.warning("No transactions prepared")
             return
 
-        transaction_lengths = [len(t) for t in self.transactions]
+        transaction_lengths = self.transactions.lengths()
 
-        print("\n=== Transaction Pattern Analysis ===")
-        print(f"Total transactions: {len(self.transactions)}")
-        print(f"Average items per transaction: {np.mean(transaction_lengths):.2f}")
-        print(f"Standard deviation: {np.std(transaction_lengths):.2f}")
-        print(f"Max items: {max(transaction_lengths)}")
-        print(f"Min items: {min(transaction_lengths)}")
+        logger.info("=== Transaction Pattern Analysis ===")
+        logger.info("Total transactions: %d", len(self.transactions))
+        logger.info("Average items per transaction: %.2f", np.mean(transaction_lengths))
+        logger.info("Standard deviation: %.2f", np.std(transaction_lengths))
+        logger.info("Max items: %d", max(transaction_lengths))
+        logger.info("Min items: %d", min(transaction_lengths))
 
         # Recommend min_support based on data characteristics
         total_items = sum(transaction_lengths)
@@ -171,5 +453,5 @@ class DataPreprocessor:
 
         # Simple heuristic for min_support
         recommended_support = max(0.001, 1 / (len(self.transactions) * 0.1))
-        print(f"Recommended min_support: {recommended_support:.4f}")
-        print(f"Recommended min_confidence: 0.3 - 0.5")
\ No newline at end of file
+        logger.info("Recommended min_support: %.4f", recommended_support)
+        logger.info("Recommended min_confidence: 0.3 - 0.5")
\ No newline at end of file
@@ -0,0 +1,83 @@
+import numpy as np
+from typing import List, Dict, Hashable, Tuple
+from collections import defaultdict
+
+try:
+    from .support_counting import min_support_count
+except ImportError:
+    from support_counting import min_support_count
+
+
+class Eclat:
+    """Depth-first vertical frequent itemset mining over tidsets (Eclat) or diffsets (dEclat)
+
+    Only the equivalence classes along the current root-to-leaf path are held in
+    memory, instead of whole levels of candidates. With ``use_diffsets`` each
+    itemset keeps the transactions its parent has but it lacks, which is much
+    smaller than the tidset on dense data with long baskets.
+    """
+
+    def __init__(self, min_support: float = 0.01, use_diffsets: bool = False):
+        self.min_support = min_support
+        self.use_diffsets = use_diffsets
+
+    def find_frequent_itemsets(self, transactions: List[List[Hashable]]) -> Dict[int, Dict[frozenset, float]]:
+        """Find all frequent itemsets, grouped by size like Apriori.find_frequent_itemsets"""
+        total_transactions = len(transactions)
+        if not total_transactions:
+            return {}
+
+        min_count = min_support_count(self.min_support, total_transactions)
+
+        # Vertical layout: item -> sorted array of the transaction IDs containing it
+        tid_lists = defaultdict(list)
+        for tid, transaction in enumerate(transactions):
+            for item in set(transaction):
+                tid_lists[item].append(tid)
+
+        # Least frequent items first keeps the equivalence classes small
+        members = [(item, np.array(tids, dtype=np.int64), len(tids))
+                   for item, tids in tid_lists.items() if len(tids) >= min_count]
+        members.sort(key=lambda member: (member[2], member[0]))
+
+        counts = {}
+        self._mine((), members, min_count, counts, members_are_diffsets=False)
+
+        frequent_itemsets = defaultdict(dict)
+        for itemset, count in counts.items():
+            frequent_itemsets[len(itemset)][frozenset(itemset)] = count / total_transactions
+
+        return {k: frequent_itemsets[k] for k in sorted(frequent_itemsets)}
+
+    def _mine(self, prefix: Tuple, members: List[Tuple], min_count: int, counts: Dict[Tuple, int],
+              members_are_diffsets: bool):
+        """Extend ``prefix`` with each member and recurse into the member's equivalence class
+
+        ``members`` holds (item, tidset or diffset, count) for every frequent
+        one-item extension of ``prefix``.
+        """
+        for i, (item, vertical, count) in enumerate(members):
+            itemset = prefix + (item,)
+            counts[itemset] = count
+
+            children = []
+            for other_item, other_vertical, _ in members[i + 1:]:
+                if not self.use_diffsets:
+                    # t(PXY) = t(PX) & t(PY)
+                    child = np.intersect1d(vertical, other_vertical, assume_unique=True)
+                    child_count = len(child)
+                elif members_are_diffsets:
+                    # d(PXY) = d(PY) - d(PX)
+                    child = np.setdiff1d(other_vertical, vertical, assume_unique=True)
+                    child_count = count - len(child)
+                else:
+                    # d(XY) = t(X) - t(Y)
+                    child = np.setdiff1d(vertical, other_vertical, assume_unique=True)
+                    child_count = count - len(child)
+
+                if child_count >= min_count:
+                    children.append((other_item, child, child_count))
+
+            if children:
+                self._mine(itemset, children, min_count, counts,
+                           members_are_diffsets=self.use_diffsets)
@@ -0,0 +1,134 @@
+from typing import List, Dict, Hashable, Tuple
+from itertools import combinations
+from collections import defaultdict
+import logging
+
+try:
+    from .support_counting import min_support_count
+except ImportError:
+    from support_counting import min_support_count
+
+logger = logging.getLogger(__name__)
+
+
+class FPNode:
+    __slots__ = ('item', 'count', 'parent', 'children')
+
+    def __init__(self, item, parent):
+        self.item = item
+        self.count = 0
+        self.parent = parent
+        self.children = {}
+
+
+class FPTree:
+    def __init__(self):
+        self.root = FPNode(None, None)
+        # item -> every node holding that item (the header table node-links)
+        self.header = defaultdict(list)
+
+    def insert(self, items: List[Hashable], count: int = 1):
+        """Insert an ordered list of items, sharing the prefix with existing paths"""
+        node = self.root
+        for item in items:
+            child = node.children.get(item)
+            if child is None:
+                child = node.children[item] = FPNode(item, node)
+                self.header[item].append(child)
+            child.count += count
+            node = child
+
+    def single_path(self) -> List[FPNode]:
+        """Return the nodes of the tree if it is a single path, otherwise None"""
+        path = []
+        node = self.root
+        while node.children:
+            if len(node.children) > 1:
+                return None
+            node = next(iter(node.children.values()))
+            path.append(node)
+        return path
+
+
+class FPGrowth:
+    """Frequent itemset mining with an FP-tree, without candidate generation"""
+
+    def __init__(self, min_support: float = 0.01):
+        self.min_support = min_support
+
+    def find_frequent_itemsets(self, transactions: List[List[Hashable]]) -> Dict[int, Dict[frozenset, float]]:
+        """Find all frequent itemsets, grouped by size like Apriori.find_frequent_itemsets"""
+        total_transactions = len(transactions)
+        if not total_transactions:
+            return {}
+
+        min_count = min_support_count(self.min_support, total_transactions)
+
+        item_counts = defaultdict(int)
+        for transaction in transactions:
+            for item in set(transaction):
+                item_counts[item] += 1
+
+        frequent_items = {item: count for item, count in item_counts.items() if count >= min_count}
+        # Most frequent items first so transactions share as much of their paths as possible
+        rank = {item: i for i, item in enumerate(sorted(frequent_items, key=lambda x: (-frequent_items[x], x)))}
+
+        tree = FPTree()
+        for transaction in transactions:
+            items = sorted({item for item in transaction if item in rank}, key=rank.__getitem__)
+            if items:
+                tree.insert(items)
+
+        logger.info("Built FP-tree over %d frequent items", len(frequent_items))
+
+        counts = {}
+        self._mine(tree, (), min_count, counts)
+
+        frequent_itemsets = defaultdict(dict)
+        for itemset, count in counts.items():
+            frequent_itemsets[len(itemset)][frozenset(itemset)] = count / total_transactions
+
+        return {k: frequent_itemsets[k] for k in sorted(frequent_itemsets)}
+
+    def _mine(self, tree: FPTree, suffix: Tuple, min_count: int, counts: Dict[Tuple, int]):
+        """Recursively mine the conditional trees of ``tree`` for itemsets ending in ``suffix``"""
+        path = tree.single_path()
+        if path is not None:
+            # Every combination of a single path is frequent with the count of its deepest node
+            for size in range(1, len(path) + 1):
+                for nodes in combinations(path, size):
+                    itemset = tuple(node.item for node in nodes) + suffix
+                    counts[itemset] = nodes[-1].count
+            return
+
+        for item, nodes in tree.header.items():
+            item_count = sum(node.count for node in nodes)
+            if item_count < min_count:
+                continue
+
+            itemset = (item,) + suffix
+            counts[itemset] = item_count
+
+            # Conditional pattern base: the prefix path above every node of this item
+            pattern_base = []
+            base_counts = defaultdict(int)
+            for node in nodes:
+                prefix_path = []
+                parent = node.parent
+                while parent.item is not None:
+                    prefix_path.append(parent.item)
+                    parent = parent.parent
+                if prefix_path:
+                    prefix_path.reverse()
+                    pattern_base.append((prefix_path, node.count))
+                    for prefix_item in prefix_path:
+                        base_counts[prefix_item] += node.count
+
+            conditional_tree = FPTree()
+            for prefix_path, count in pattern_base:
+                items = [prefix_item for prefix_item in prefix_path if base_counts[prefix_item] >= min_count]
+                if items:
+                    conditional_tree.insert(items, count)
+
+            if conditional_tree.root.children:
+                self._mine(conditional_tree, itemset, min_count, counts)
@@ -0,0 +1,151 @@
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Dict, Any, Iterator
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident memory of this process so far, None where the platform doesn't report it"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class PhaseStats:
+    """Counters and timings of one mining phase, such as one level of candidates or rule generation
+
+    ``wall_time`` and ``cpu_time`` are seconds; CPU time is that of this
+    process, so work done in support counting worker processes is not in it.
+    ``process_peak_rss_bytes`` is the high-water mark of the whole process at
+    the end of the phase, which earlier phases or other work may have set.
+    The memory of the phase itself is ``peak_traced_bytes``: the peak memory
+    allocated during the phase on top of what was allocated when it started,
+    recorded while tracemalloc is tracing (see RunStats ``track_memory``).
+    """
+
+    def __init__(self, name: str, counters: Dict[str, int] = None):
+        self.name = name
+        self.counters = dict(counters or {})
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.process_peak_rss_bytes = None
+        self.peak_traced_bytes = None
+
+    def add(self, **counters: int):
+        """Add to the named counters"""
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'phase': self.name, **self.counters,
+                'wall_time': self.wall_time, 'cpu_time': self.cpu_time,
+                'process_peak_rss_bytes': self.process_peak_rss_bytes, 'peak_traced_bytes': self.peak_traced_bytes}
+
+    def __repr__(self) -> str:
+        return f"PhaseStats({self.name!r}, {self.counters}, wall_time={self.wall_time:.4f})"
+
+
+class RunStats:
+    """Per-phase statistics of one mining run, in the order the phases ran
+
+    The level-wise miner records a phase per level k ('level k') with the
+    candidates generated by the join, those pruned by the subset check, the
+    support evaluations and the frequent itemsets found. Other algorithms are
+    recorded as a single 'mine' phase, and rule generation as 'rules'.
+
+    With ``track_memory``, tracemalloc traces every phase (started and stopped
+    around it unless it is already tracing), so each phase gets its own
+    ``peak_traced_bytes``. Tracing slows the phases down several times.
+    """
+
+    def __init__(self, track_memory: bool = False, **config: Any):
+        self.track_memory = track_memory
+        self.config = config
+        self.started_at = datetime.now().isoformat()
+        self.phases: List[PhaseStats] = []
+
+    @contextmanager
+    def phase(self, name: str, replace: bool = False, **counters: int) -> Iterator[PhaseStats]:
+        """Time the enclosed block as a phase; ``replace`` drops earlier phases of the same name"""
+        if replace:
+            self.phases = [phase for phase in self.phases if phase.name != name]
+        stats = PhaseStats(name, counters)
+        self.phases.append(stats)
+
+        started_tracing = self.track_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            traced_at_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield stats
+        finally:
+            stats.wall_time = time.perf_counter() - wall_start
+            stats.cpu_time = time.process_time() - cpu_start
+            stats.process_peak_rss_bytes = peak_rss_bytes()
+            if tracing and tracemalloc.is_tracing():
+                stats.peak_traced_bytes = max(0, tracemalloc.get_traced_memory()[1] - traced_at_start)
+            if started_tracing:
+                tracemalloc.stop()
+
+    def get(self, name: str) -> PhaseStats:
+        """Last phase with the given name, None if there is none"""
+        for phase in reversed(self.phases):
+            if phase.name == name:
+                return phase
+        return None
+
+    @property
+    def levels(self) -> Dict[int, PhaseStats]:
+        """Phases of the level-wise miner by level k"""
+        return {int(phase.name.split()[1]): phase for phase in self.phases
+                if phase.name.startswith('level ') and phase.name.split()[1].isdigit()}
+
+    def totals(self) -> Dict[str, Any]:
+        """Counters and times summed over all phases, with the highest peak memory"""
+        totals = {}
+        for phase in self.phases:
+            for name, value in phase.counters.items():
+                totals[name] = totals.get(name, 0) + value
+        totals['wall_time'] = sum(phase.wall_time for phase in self.phases)
+        totals['cpu_time'] = sum(phase.cpu_time for phase in self.phases)
+        rss = [phase.process_peak_rss_bytes for phase in self.phases if phase.process_peak_rss_bytes is not None]
+        totals['process_peak_rss_bytes'] = max(rss) if rss else None
+        traced = [phase.peak_traced_bytes for phase in self.phases if phase.peak_traced_bytes is not None]
+        totals['peak_traced_bytes'] = max(traced) if traced else None
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'started_at': self.started_at, 'config': self.config,
+                'phases': [phase.to_dict() for phase in self.phases], 'totals': self.totals()}
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """One row per phase, one column per counter and timing"""
+        return pd.DataFrame([phase.to_dict() for phase in self.phases])
+
+    def save(self, path: str):
+        """Write the statistics as JSON"""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def __len__(self) -> int:
+        return len(self.phases)
+
+    def __repr__(self) -> str:
+        return f"RunStats({[phase.name for phase in self.phases]})"
@@ -0,0 +1,100 @@
+from typing import List, Dict, Hashable, Tuple
+from collections import defaultdict
+
+try:
+    from .support_counting import item_bitmaps, min_support_count, _popcount
+except ImportError:
+    from support_counting import item_bitmaps, min_support_count, _popcount
+
+
+class Mafia:
+    """Maximal frequent itemset mining over tidset bitmaps, with MAFIA's pruning
+
+    The depth-first search prunes with parent equivalence (tail items present
+    in every transaction of the head join the head without branching), FHUT
+    (a frequent head-union-tail ends the branch) and HUTMFI (a head-union-tail
+    already inside a found maximal itemset skips the branch). Subset checks use
+    one bitmap per item over the indices of the maximal itemsets found so far.
+    """
+
+    def __init__(self, min_support: float = 0.01):
+        self.min_support = min_support
+
+    def find_frequent_itemsets(self, transactions: List[List[Hashable]]) -> Dict[int, Dict[frozenset, float]]:
+        """Find the maximal frequent itemsets, grouped by size like Apriori.find_frequent_itemsets"""
+        total_transactions = len(transactions)
+        if not total_transactions:
+            return {}
+
+        self._min_count = min_support_count(self.min_support, total_transactions)
+        bitmaps = item_bitmaps(transactions)
+
+        tail = [(item, tids, _popcount(tids)) for item, tids in bitmaps.items()]
+        tail = [(item, tids) for item, tids, count in sorted(tail, key=lambda entry: (entry[2], entry[0]))
+                if count >= self._min_count]
+
+        self._maximal = []
+        # item -> bitmap of the indices in self._maximal of the itemsets containing it
+        self._index = defaultdict(int)
+        self._search((), (1 << total_transactions) - 1, total_transactions, tail)
+
+        frequent_itemsets = defaultdict(dict)
+        for i, (itemset, count) in enumerate(self._maximal):
+            # Drop itemsets a later branch found a superset of
+            if self._superset_indices(itemset) & ~(1 << i):
+                continue
+            frequent_itemsets[len(itemset)][itemset] = count / total_transactions
+
+        return {k: frequent_itemsets[k] for k in sorted(frequent_itemsets)}
+
+    def _superset_indices(self, items) -> int:
+        """Bitmap of the found maximal itemsets containing every one of ``items``"""
+        indices = -1
+        for item in items:
+            indices &= self._index.get(item, 0)
+            if not indices:
+                return 0
+        return indices
+
+    def _add(self, itemset: frozenset, count: int):
+        if self._superset_indices(itemset):
+            return
+        bit = 1 << len(self._maximal)
+        self._maximal.append((itemset, count))
+        for item in itemset:
+            self._index[item] |= bit
+
+    def _search(self, head: Tuple, head_tids: int, head_count: int, tail: List[Tuple]):
+        """Extend ``head`` with the items of ``tail`` (item, tidset), in order"""
+        # HUTMFI: everything this branch can reach is already inside a maximal itemset
+        if head and self._superset_indices(head + tuple(item for item, _ in tail)):
+            return
+
+        extensions = []
+        for item, tids in tail:
+            joined = head_tids & tids
+            joined_count = _popcount(joined)
+            if joined_count == head_count:
+                # Parent equivalence: the item is in every transaction of the head
+                head = head + (item,)
+            elif joined_count >= self._min_count:
+                extensions.append((item, joined, joined_count))
+
+        if not extensions:
+            self._add(frozenset(head), head_count)
+            return
+
+        # Least frequent extensions first, as in the initial item order
+        extensions.sort(key=lambda extension: extension[2])
+
+        # FHUT: if head plus all frequent extensions is frequent, it is the only candidate below
+        all_tids = head_tids
+        for _, tids, _ in extensions:
+            all_tids &= tids
+        all_count = _popcount(all_tids)
+        if all_count >= self._min_count:
+            self._add(frozenset(head + tuple(item for item, _, _ in extensions)), all_count)
+            return
+
+        for i, (item, tids, count) in enumerate(extensions):
+            self._search(head + (item,), tids, count, [(other, other_tids) for other, other_tids, _ in extensions[i + 1:]])
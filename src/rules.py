@@ -0,0 +1,109 @@
+import numpy as np
+from typing import List, Dict, Any, Iterable, Iterator, Union
+
+RULE_METRICS = ('support', 'confidence', 'lift', 'conviction')
+
+
+class RuleSet:
+    """Association rules kept as NumPy metric columns, with a lazy list-of-dicts view
+
+    It behaves like the list of rule dicts it replaces: ``len()``, iteration,
+    indexing and slicing return dicts with 'antecedent', 'consequent' and the
+    metrics. The dicts are only built when they are asked for. Top-N queries
+    use argpartition, and the sort order of each metric is computed once.
+    """
+
+    def __init__(self, antecedents: List[set], consequents: List[set], metrics: Dict[str, Iterable[float]]):
+        self.antecedents = antecedents
+        self.consequents = consequents
+        self.metrics = {metric: np.asarray(metrics[metric], dtype=np.float64) for metric in RULE_METRICS}
+        # metric -> indices of the rules from best to worst, ties in rule order
+        self._orders = {}
+        self._records = None
+
+    @classmethod
+    def from_rules(cls, rules: Iterable[Dict[str, Any]]) -> 'RuleSet':
+        """Build a RuleSet from a list of rule dicts"""
+        rules = list(rules)
+        return cls([rule['antecedent'] for rule in rules], [rule['consequent'] for rule in rules],
+                   {metric: [rule[metric] for rule in rules] for metric in RULE_METRICS})
+
+    def column(self, metric: str) -> np.ndarray:
+        """Values of one metric for every rule, in rule order"""
+        if metric not in self.metrics:
+            raise ValueError(f"Unknown metric '{metric}'. Choose one of {RULE_METRICS}")
+        return self.metrics[metric]
+
+    def order(self, metric: str) -> np.ndarray:
+        """Rule indices sorted by a metric, best first; equal values keep the rule order"""
+        order = self._orders.get(metric)
+        if order is None:
+            order = self._orders[metric] = np.argsort(-self.column(metric), kind='stable')
+        return order
+
+    def top_indices(self, n: int, metric: str = 'confidence') -> np.ndarray:
+        """Indices of the n best rules by a metric, in the order of order(metric)"""
+        values = self.column(metric)
+        n = max(0, min(n, len(self)))
+        if metric in self._orders or n == len(self):
+            return self.order(metric)[:n]
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+
+        # n-th largest value; among the rules equal to it, the first ones in rule order make the cut
+        threshold = np.partition(values, len(values) - n)[len(values) - n]
+        above = np.flatnonzero(values > threshold)
+        ties = np.flatnonzero(values == threshold)[:n - len(above)]
+        chosen = np.concatenate((above, ties))
+        return chosen[np.lexsort((chosen, -values[chosen]))]
+
+    def top(self, n: int, metric: str = 'confidence') -> List[Dict[str, Any]]:
+        """The n best rules by a metric, as dicts"""
+        return [self._record(i) for i in self.top_indices(n, metric)]
+
+    def sorted_by(self, metric: str) -> 'RuleSet':
+        """RuleSet with the rules ordered by a metric, best first"""
+        return self.take(self.order(metric))
+
+    def take(self, indices: Iterable[int]) -> 'RuleSet':
+        """RuleSet holding the rules at ``indices``, in that order"""
+        indices = np.asarray(indices, dtype=np.int64)
+        return RuleSet([self.antecedents[i] for i in indices], [self.consequents[i] for i in indices],
+                       {metric: values[indices] for metric, values in self.metrics.items()})
+
+    def _record(self, index: int) -> Dict[str, Any]:
+        if self._records is not None:
+            return self._records[index]
+        record = {'antecedent': self.antecedents[index], 'consequent': self.consequents[index]}
+        for metric, values in self.metrics.items():
+            record[metric] = float(values[index])
+        return record
+
+    @property
+    def records(self) -> List[Dict[str, Any]]:
+        """All rules as dicts, built once on first use"""
+        if self._records is None:
+            columns = [values.tolist() for values in self.metrics.values()]
+            self._records = [
+                {'antecedent': antecedent, 'consequent': consequent, **dict(zip(self.metrics, values))}
+                for antecedent, consequent, *values in zip(self.antecedents, self.consequents, *columns)
+            ]
+        return self._records
+
+    def __len__(self) -> int:
+        return len(self.antecedents)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.records)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("rule index out of range")
+        return self._record(index)
+
+    def __repr__(self) -> str:
+        return f"RuleSet({len(self)} rules)"
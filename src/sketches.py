@@ -0,0 +1,324 @@
+import heapq
+import hashlib
+import numpy as np
+from collections import Counter
+from math import ceil, e, log
+from typing import Dict, Hashable, Iterable
+
+SKETCH_METHODS = ('lossy', 'spacesaving', 'countmin')
+
+_MASK64 = (1 << 64) - 1
+
+
+def _key_code(key: Hashable) -> int:
+    """Stable 64-bit code of a key, the same in every process (unlike hash() of a string)"""
+    if isinstance(key, (int, np.integer)):
+        return int(key) & _MASK64
+    if isinstance(key, tuple) and all(isinstance(part, (int, np.integer)) for part in key):
+        code = len(key)
+        for part in key:
+            code = (code * 0x100000001B3 + (int(part) & _MASK64)) & _MASK64
+        return code
+    return int.from_bytes(hashlib.blake2b(repr(key).encode(), digest_size=8).digest(), 'little')
+
+
+def _aggregate(keys: Iterable[Hashable]) -> Dict[Hashable, int]:
+    """Occurrences of every distinct key, counted with NumPy for an integer array"""
+    if isinstance(keys, np.ndarray):
+        distinct, counts = np.unique(keys, return_counts=True)
+        return dict(zip(distinct.tolist(), counts.tolist()))
+    return Counter(keys)
+
+
+class LossyCounter:
+    """Lossy Counting (Manku & Motwani): approximate counts with at most ``error * total`` undercount
+
+    The stream is split into buckets of ``ceil(1 / error)``; at every bucket
+    boundary keys whose count could not exceed the number of buckets seen are
+    dropped, which bounds memory by about ``log(error * total) / error`` keys.
+    """
+
+    name = 'lossy'
+
+    def __init__(self, error: float = 0.001):
+        if not 0 < error < 1:
+            raise ValueError("error must be between 0 and 1")
+        self.error = error
+        self.bucket_width = ceil(1 / error)
+        self.total = 0
+        # key -> [count since tracked, maximum count missed before tracking]
+        self._entries = {}
+
+    def add(self, key: Hashable, count: int = 1):
+        """Count ``count`` occurrences of a key"""
+        bucket = self.total // self.bucket_width
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = [count, bucket]
+        else:
+            entry[0] += count
+
+        self.total += count
+        if self.total // self.bucket_width > bucket:
+            self._prune()
+
+    def update(self, keys: Iterable[Hashable]):
+        """Count one occurrence of every key, a batch at a time
+
+        The batch is counted as if each key's occurrences came in a row at its
+        start, so pruning waits for the end of the batch and the bounds still hold.
+        """
+        bucket = self.total // self.bucket_width
+        for key, count in _aggregate(keys).items():
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = [count, bucket]
+            else:
+                entry[0] += count
+            self.total += count
+        if self.total // self.bucket_width > bucket:
+            self._prune()
+
+    def _prune(self):
+        bucket = self.total // self.bucket_width
+        self._entries = {key: entry for key, entry in self._entries.items() if entry[0] + entry[1] > bucket}
+
+    def estimate(self, key: Hashable) -> int:
+        """Upper bound of the count of a key, at most error_bound() above the true count"""
+        entry = self._entries.get(key)
+        if entry is None:
+            # Keys are only dropped while their count is at most the number of completed buckets
+            return self.total // self.bucket_width
+        return entry[0] + entry[1]
+
+    def error_bound(self) -> int:
+        """Maximum overestimate of estimate(), at most ``error * total``"""
+        return self.total // self.bucket_width
+
+    def frequent(self, min_count: int, candidates: Iterable[Hashable] = None) -> Dict[Hashable, int]:
+        """Keys whose estimated count reaches ``min_count``; no key with that true count is missed"""
+        keys = self._entries if candidates is None else candidates
+        estimates = {key: self.estimate(key) for key in keys}
+        return {key: count for key, count in estimates.items() if count >= min_count}
+
+    def merge(self, other: 'LossyCounter') -> 'LossyCounter':
+        """Add the counts of a counter built over another shard of the stream"""
+        if other.bucket_width != self.bucket_width:
+            raise ValueError("Only counters with the same error can be merged")
+
+        self_missed = self.error_bound()
+        other_missed = other.error_bound()
+        entries = {}
+        for key in self._entries.keys() | other._entries.keys():
+            count, missed = self._entries.get(key, (0, self_missed))
+            other_count, other_missed_key = other._entries.get(key, (0, other_missed))
+            entries[key] = [count + other_count, missed + other_missed_key]
+
+        self._entries = entries
+        self.total += other.total
+        self._prune()
+        return self
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SpaceSaving:
+    """Space-Saving (Metwally et al.): top counts with a fixed number of counters
+
+    When all ``capacity`` counters are taken, a new key replaces the key with
+    the smallest count and inherits that count as its possible overestimate.
+    Every count is at most ``total / capacity`` above the true count.
+    update() counts a batch of keys at once: monitored keys are incremented in
+    place, and a heap of the smallest counters is built only when a batch
+    brings keys that need to replace others.
+    """
+
+    name = 'spacesaving'
+
+    def __init__(self, capacity: int = None, error: float = 0.001):
+        self.capacity = capacity if capacity is not None else ceil(1 / error)
+        if self.capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.total = 0
+        # key -> [count, overestimate]
+        self._counters = {}
+
+    def add(self, key: Hashable, count: int = 1):
+        """Count ``count`` occurrences of a key"""
+        self._add_counts({key: count})
+
+    def update(self, keys: Iterable[Hashable]):
+        """Count one occurrence of every key, a batch at a time (any stream order keeps the bounds)"""
+        self._add_counts(_aggregate(keys))
+
+    def _add_counts(self, counts: Dict[Hashable, int]):
+        """Count ``counts[key]`` occurrences of every key"""
+        new_keys = []
+        for key, count in counts.items():
+            self.total += count
+            counter = self._counters.get(key)
+            if counter is not None:
+                counter[0] += count
+            elif len(self._counters) < self.capacity:
+                self._counters[key] = [count, 0]
+            else:
+                new_keys.append((count, key))
+        if not new_keys:
+            return
+
+        # Replace the smallest counters, the keys with the largest counts last so they are least likely evicted
+        heap = [(counter[0], i, key) for i, (key, counter) in enumerate(self._counters.items())]
+        heapq.heapify(heap)
+        sequence = len(heap)
+        new_keys.sort(key=lambda entry: entry[0])
+        for count, key in new_keys:
+            min_count, _, min_key = heapq.heappop(heap)
+            del self._counters[min_key]
+            self._counters[key] = [min_count + count, min_count]
+            heapq.heappush(heap, (min_count + count, sequence, key))
+            sequence += 1
+
+    def _min_count(self) -> int:
+        """Count an unmonitored key may have at most"""
+        if len(self._counters) < self.capacity:
+            return 0
+        return min(counter[0] for counter in self._counters.values())
+
+    def estimate(self, key: Hashable) -> int:
+        """Upper bound of the count of a key, at most error_bound() above the true count"""
+        counter = self._counters.get(key)
+        return self._min_count() if counter is None else counter[0]
+
+    def error_bound(self) -> int:
+        """Maximum overestimate of estimate(), at most ``total / capacity``"""
+        return self._min_count()
+
+    def frequent(self, min_count: int, candidates: Iterable[Hashable] = None) -> Dict[Hashable, int]:
+        """Keys whose estimated count reaches ``min_count``; no key with that true count is missed"""
+        if candidates is None:
+            return {key: counter[0] for key, counter in self._counters.items() if counter[0] >= min_count}
+        unmonitored = self._min_count()
+        estimates = {key: self._counters[key][0] if key in self._counters else unmonitored for key in candidates}
+        return {key: count for key, count in estimates.items() if count >= min_count}
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """Add the counts of a summary built over another shard of the stream, keeping ``capacity`` keys"""
+        self_missed = self._min_count()
+        other_missed = other._min_count()
+        counters = {}
+        for key in self._counters.keys() | other._counters.keys():
+            count, over = self._counters.get(key, (self_missed, self_missed))
+            other_count, other_over = other._counters.get(key, (other_missed, other_missed))
+            counters[key] = [count + other_count, over + other_over]
+
+        kept = heapq.nlargest(self.capacity, counters.items(), key=lambda entry: entry[1][0])
+        self._counters = dict(kept)
+        self.total += other.total
+        return self
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+
+class CountMinSketch:
+    """Count-Min sketch (Cormode & Muthukrishnan): counts of any key in a fixed ``depth x width`` table
+
+    Estimates never undercount, and overcount by more than ``error * total``
+    only with probability ``failure_probability``. The sketch keeps no keys, so
+    frequent() needs the candidate keys to check.
+    """
+
+    name = 'countmin'
+
+    def __init__(self, error: float = 0.001, failure_probability: float = 0.01, seed: int = 0):
+        if not 0 < error < 1 or not 0 < failure_probability < 1:
+            raise ValueError("error and failure_probability must be between 0 and 1")
+        # Width rounded up to a power of two for multiply-shift hashing
+        self.width_bits = max(1, ceil(log(e / error, 2)))
+        self.width = 1 << self.width_bits
+        self.depth = max(1, ceil(log(1 / failure_probability)))
+        self.seed = seed
+        self.total = 0
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+
+        rng = np.random.default_rng(seed)
+        # Odd multipliers and offsets of one multiply-shift hash per row
+        self._multipliers = rng.integers(0, 1 << 63, self.depth, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._offsets = rng.integers(0, 1 << 63, self.depth, dtype=np.uint64)
+
+    @property
+    def error(self) -> float:
+        return e / self.width
+
+    @staticmethod
+    def _codes(keys: Iterable[Hashable]) -> np.ndarray:
+        """Key codes as a uint64 array, converted directly for an array of non-negative integers"""
+        if isinstance(keys, np.ndarray) and np.issubdtype(keys.dtype, np.integer):
+            return keys.astype(np.uint64)
+        return np.fromiter((_key_code(key) for key in keys), dtype=np.uint64)
+
+    def _columns(self, codes: np.ndarray) -> np.ndarray:
+        """Column of every key code in every row, shape (depth, len(codes))"""
+        shift = np.uint64(64 - self.width_bits)
+        with np.errstate(over='ignore'):
+            hashed = self._multipliers[:, None] * codes[None, :] + self._offsets[:, None]
+        return (hashed >> shift).astype(np.int64)
+
+    def add(self, key: Hashable, count: int = 1):
+        """Count ``count`` occurrences of a key"""
+        columns = self._columns(np.array([_key_code(key)], dtype=np.uint64))[:, 0]
+        self.table[np.arange(self.depth), columns] += count
+        self.total += count
+
+    def update(self, keys: Iterable[Hashable]):
+        """Count one occurrence of every key, hashing all of them at once"""
+        codes = self._codes(keys)
+        if not len(codes):
+            return
+        columns = self._columns(codes)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(columns[row], minlength=self.width)
+        self.total += len(codes)
+
+    def estimate(self, key: Hashable) -> int:
+        """Upper bound of the count of a key"""
+        columns = self._columns(np.array([_key_code(key)], dtype=np.uint64))[:, 0]
+        return int(self.table[np.arange(self.depth), columns].min())
+
+    def error_bound(self) -> int:
+        """Overestimate of estimate() that holds with probability 1 - failure_probability"""
+        return int(self.error * self.total)
+
+    def frequent(self, min_count: int, candidates: Iterable[Hashable] = None) -> Dict[Hashable, int]:
+        """Candidates whose estimated count reaches ``min_count``; no key with that true count is missed"""
+        if candidates is None:
+            raise ValueError("CountMinSketch keeps no keys, pass the candidate keys to check")
+        candidates = list(candidates)
+        if not candidates:
+            return {}
+        codes = self._codes(candidates)
+        estimates = self.table[np.arange(self.depth)[:, None], self._columns(codes)].min(axis=0)
+        return {key: int(count) for key, count in zip(candidates, estimates) if count >= min_count}
+
+    def merge(self, other: 'CountMinSketch') -> 'CountMinSketch':
+        """Add the counts of a sketch built with the same parameters over another shard"""
+        if (other.width, other.depth, other.seed) != (self.width, self.depth, self.seed):
+            raise ValueError("Only sketches with the same width, depth and seed can be merged")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+    def __len__(self) -> int:
+        return self.table.size
+
+
+def make_sketch(method: str, error: float = 0.001):
+    """Create an empty counting sketch with the given relative error"""
+    if method == 'lossy':
+        return LossyCounter(error)
+    if method == 'spacesaving':
+        return SpaceSaving(error=error)
+    if method == 'countmin':
+        return CountMinSketch(error)
+    raise ValueError(f"Unknown sketch '{method}'. Choose one of {SKETCH_METHODS}")
@@ -0,0 +1,113 @@
+import pandas as pd
+from typing import Dict, Any, Hashable, Iterable, Tuple, Union
+from itertools import combinations
+from collections import deque, defaultdict
+from datetime import timedelta
+
+try:
+    from .apriori import Apriori
+    from .rules import RuleSet
+    from .support_counting import min_support_count
+except ImportError:
+    from apriori import Apriori
+    from rules import RuleSet
+    from support_counting import min_support_count
+
+
+class SlidingWindowMiner:
+    """Frequent itemsets and association rules over the transactions of a sliding time window
+
+    When a transaction enters the window the count of each of its itemsets of
+    up to ``max_len`` items goes up by one, and goes down again when it leaves,
+    so the current itemsets and rules are read off the counts without re-mining.
+    The cost per transaction depends only on its length and ``max_len``, and
+    memory only on the transactions and itemsets inside the window.
+    """
+
+    def __init__(self, window: Union[str, int, timedelta] = '30D', min_support: float = 0.01,
+                 min_confidence: float = 0.5, max_len: int = 3):
+        # window: a pandas Timedelta string ('30D', '12h'), a timedelta, or a number of days
+        if isinstance(window, (int, float)):
+            window = timedelta(days=window)
+        self.window = pd.Timedelta(window)
+        if self.window <= pd.Timedelta(0):
+            raise ValueError("window must be a positive duration")
+        if max_len < 1:
+            raise ValueError("max_len must be at least 1")
+
+        self.min_support = min_support
+        self.min_confidence = min_confidence
+        self.max_len = max_len
+        self.latest = None
+        # (timestamp, sorted items) of every transaction inside the window, oldest first
+        self._transactions = deque()
+        self._counts = defaultdict(int)
+
+    def add(self, timestamp, transaction: Iterable[Hashable]):
+        """Add one transaction and evict the transactions that fell out of the window"""
+        timestamp = pd.Timestamp(timestamp)
+        if self.latest is not None and timestamp < self.latest:
+            raise ValueError(f"Transactions must arrive in time order ({timestamp} is before {self.latest})")
+
+        items = tuple(sorted(set(transaction)))
+        for itemset in self._itemsets(items):
+            self._counts[itemset] += 1
+        self._transactions.append((timestamp, items))
+        self.advance_to(timestamp)
+
+    def extend(self, dated_transactions: Iterable[Tuple[Any, Iterable[Hashable]]]):
+        """Add (timestamp, items) pairs in time order, e.g. from DataPreprocessor.iter_dated_transactions"""
+        for timestamp, transaction in dated_transactions:
+            self.add(timestamp, transaction)
+
+    def advance_to(self, timestamp):
+        """Move the end of the window to ``timestamp``, evicting transactions older than the window"""
+        timestamp = pd.Timestamp(timestamp)
+        if self.latest is None or timestamp > self.latest:
+            self.latest = timestamp
+
+        cutoff = self.latest - self.window
+        while self._transactions and self._transactions[0][0] <= cutoff:
+            _, items = self._transactions.popleft()
+            for itemset in self._itemsets(items):
+                count = self._counts[itemset] - 1
+                if count:
+                    self._counts[itemset] = count
+                else:
+                    del self._counts[itemset]
+
+    def _itemsets(self, items: Tuple) -> Iterable[frozenset]:
+        """Every itemset of up to max_len items of one transaction"""
+        for k in range(1, min(self.max_len, len(items)) + 1):
+            for itemset in combinations(items, k):
+                yield frozenset(itemset)
+
+    def frequent_itemsets(self) -> Dict[int, Dict[frozenset, float]]:
+        """Frequent itemsets of the current window, grouped by size like Apriori.find_frequent_itemsets"""
+        total_transactions = len(self._transactions)
+        if not total_transactions:
+            return {}
+
+        min_count = min_support_count(self.min_support, total_transactions)
+        frequent_itemsets = defaultdict(dict)
+        for itemset, count in self._counts.items():
+            if count >= min_count:
+                frequent_itemsets[len(itemset)][itemset] = count / total_transactions
+
+        return {k: frequent_itemsets[k] for k in sorted(frequent_itemsets)}
+
+    def rules(self) -> RuleSet:
+        """Association rules of the current window, in the format of Apriori.generate_rules"""
+        rule_miner = Apriori(min_support=self.min_support, min_confidence=self.min_confidence)
+        rule_miner.frequent_itemsets = self.frequent_itemsets()
+        if not rule_miner.frequent_itemsets:
+            return RuleSet.from_rules([])
+        # Every subset of a counted itemset is counted too, so the supports rules need are all there
+        return rule_miner._derive_rules(len(self._transactions))
+
+    def __len__(self) -> int:
+        return len(self._transactions)
+
+    def __repr__(self) -> str:
+        return (f"SlidingWindowMiner(window={self.window}, {len(self)} transactions, "
+                f"{len(self._counts)} itemsets counted)")
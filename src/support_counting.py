@@ -0,0 +1,367 @@
+import os
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from itertools import combinations
+from math import comb, ceil
+from operator import and_
+from typing import List, Dict, Iterable, Hashable, Tuple
+
+# Fallback budget for the bitset backend when available memory cannot be queried
+DEFAULT_BITSET_MEMORY_LIMIT = 512 * 1024 ** 2
+
+# Share of the currently available memory the bitset backend may use in 'auto' mode
+BITSET_MEMORY_FRACTION = 0.25
+
+SUPPORT_COUNTING_METHODS = ('auto', 'bitset', 'scan', 'mmap')
+
+# Bytes of every bitmap row processed at a time by the memory-mapped backend (8 transactions per byte)
+MMAP_BLOCK_BYTES = 1 << 20
+
+if hasattr(int, 'bit_count'):
+    def _popcount(value: int) -> int:
+        return value.bit_count()
+else:  # Python < 3.10
+    def _popcount(value: int) -> int:
+        return bin(value).count('1')
+
+if hasattr(np, 'bitwise_count'):
+    def _popcount_bytes(values: np.ndarray) -> int:
+        return int(np.bitwise_count(values).sum(dtype=np.int64))
+else:  # NumPy < 2.0
+    _BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def _popcount_bytes(values: np.ndarray) -> int:
+        return int(_BYTE_POPCOUNT[values].sum(dtype=np.int64))
+
+
+def min_support_count(min_support: float, total_transactions: int) -> int:
+    """Smallest transaction count whose support (count / total) reaches min_support"""
+    count = max(0, ceil(min_support * total_transactions))
+    # Float rounding can put ceil() one off, settle on the exact `count / total >= min_support` boundary
+    while count > 0 and (count - 1) / total_transactions >= min_support:
+        count -= 1
+    while count / total_transactions < min_support:
+        count += 1
+    return count
+
+
+def build_item_bitmaps(transactions: Iterable[Iterable[Hashable]]) -> Dict[Hashable, int]:
+    """Build one transaction-ID bitmap per item (bit i set if transaction i contains the item)"""
+    buffers = {}
+    transactions = list(transactions)
+    n_bytes = (len(transactions) + 7) // 8
+
+    for tid, transaction in enumerate(transactions):
+        byte_index = tid >> 3
+        bit = 1 << (tid & 7)
+        for item in transaction:
+            buffer = buffers.get(item)
+            if buffer is None:
+                buffer = buffers[item] = bytearray(n_bytes)
+            buffer[byte_index] |= bit
+
+    return {item: int.from_bytes(buffer, 'little') for item, buffer in buffers.items()}
+
+
+def item_bitmaps(transactions: Iterable[Iterable[Hashable]]) -> Dict[Hashable, int]:
+    """Per-item transaction-ID bitmaps, straight from the CSR arrays when given an encoded transaction store"""
+    if hasattr(transactions, 'item_bitmaps'):
+        return transactions.item_bitmaps()
+    return build_item_bitmaps(transactions)
+
+
+def estimate_bitset_bytes(transactions: List[List[Hashable]]) -> int:
+    """Estimate the memory needed to hold one bitmap per distinct item"""
+    n_items = getattr(transactions, 'n_items', None)
+    if n_items is None:
+        distinct_items = set()
+        for transaction in transactions:
+            distinct_items.update(transaction)
+        n_items = len(distinct_items)
+    return n_items * ((len(transactions) + 7) // 8)
+
+
+def available_memory_bytes() -> int:
+    """Return the currently available physical memory, or None if it cannot be determined"""
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+class ScanSupportCounter:
+    """Count supports by scanning the transactions, each converted to a set only once"""
+
+    name = 'scan'
+
+    def __init__(self, transactions: List[List[Hashable]]):
+        self.transactions = [frozenset(transaction) for transaction in transactions]
+        self.n_transactions = len(self.transactions)
+
+    def count(self, itemset: frozenset) -> int:
+        """Count transactions containing every item of the itemset"""
+        return sum(1 for transaction in self.transactions if itemset <= transaction)
+
+    def count_many(self, candidates: Iterable[frozenset]) -> Dict[frozenset, int]:
+        """Count a batch of same-size candidates in a single pass over the transactions"""
+        counts = {frozenset(candidate): 0 for candidate in candidates}
+        if not counts:
+            return counts
+
+        sizes = {len(candidate) for candidate in counts}
+        if len(sizes) > 1:
+            return {candidate: self.count(candidate) for candidate in counts}
+        k = sizes.pop()
+
+        for transaction in self.transactions:
+            if len(transaction) < k:
+                continue
+            # Enumerate the k-subsets of short transactions, test candidates against long ones
+            if comb(len(transaction), k) <= len(counts):
+                for subset in combinations(transaction, k):
+                    subset = frozenset(subset)
+                    if subset in counts:
+                        counts[subset] += 1
+            else:
+                for candidate in counts:
+                    if candidate <= transaction:
+                        counts[candidate] += 1
+
+        return counts
+
+    def close(self):
+        """Release resources held by the counter"""
+
+
+class BitsetSupportCounter:
+    """Count supports by intersecting per-item transaction-ID bitmaps"""
+
+    name = 'bitset'
+
+    def __init__(self, transactions: List[List[Hashable]]):
+        self.n_transactions = len(transactions)
+        self.bitmaps = item_bitmaps(transactions)
+
+    def count(self, itemset: frozenset) -> int:
+        """Count transactions containing every item of the itemset"""
+        try:
+            bitmaps = [self.bitmaps[item] for item in itemset]
+        except KeyError:
+            return 0
+        if not bitmaps:
+            return self.n_transactions
+        return _popcount(reduce(and_, bitmaps))
+
+    def extend(self, bitmaps: Dict[Hashable, int], n_transactions: int):
+        """Append ``n_transactions`` transactions given as per-item bitmaps, numbered after the counted ones"""
+        for item, bitmap in bitmaps.items():
+            self.bitmaps[item] = self.bitmaps.get(item, 0) | (bitmap << self.n_transactions)
+        self.n_transactions += n_transactions
+
+    def count_many(self, candidates: Iterable[frozenset]) -> Dict[frozenset, int]:
+        """Count a batch of candidates"""
+        return {frozenset(candidate): self.count(candidate) for candidate in candidates}
+
+    def close(self):
+        """Release resources held by the counter"""
+
+
+class MmapBitsetSupportCounter:
+    """Count supports from packed per-item bitmaps memory-mapped read-only from a .npy file
+
+    The bitmaps (see TransactionStore.write_item_bitmaps) stay in the OS page
+    cache instead of the Python heap, so several processes can share one file.
+    A counter may be limited to the byte columns ``byte_start:byte_stop``.
+    """
+
+    name = 'mmap'
+
+    def __init__(self, path: str, n_transactions: int, byte_start: int = 0, byte_stop: int = None):
+        self.path = path
+        self.n_transactions = n_transactions
+        self.bitmaps = np.load(path, mmap_mode='r')
+        self.byte_start = byte_start
+        self.byte_stop = self.bitmaps.shape[1] if byte_stop is None else byte_stop
+        # Bitmap file written only for this counter, removed on close()
+        self._temporary_path = None
+
+    def count(self, itemset: frozenset) -> int:
+        """Count transactions containing every item of the itemset"""
+        return self.count_many([itemset])[frozenset(itemset)]
+
+    def count_many(self, candidates: Iterable[frozenset]) -> Dict[frozenset, int]:
+        """Count a batch of candidates, reading the bitmap columns one block at a time"""
+        candidates = list(dict.fromkeys(frozenset(candidate) for candidate in candidates))
+        rows = [np.array(sorted(candidate), dtype=np.int64) for candidate in candidates]
+        totals = [0] * len(candidates)
+
+        for start in range(self.byte_start, self.byte_stop, MMAP_BLOCK_BYTES):
+            block = self.bitmaps[:, start:min(start + MMAP_BLOCK_BYTES, self.byte_stop)]
+            for i, item_ids in enumerate(rows):
+                totals[i] += _popcount_bytes(np.bitwise_and.reduce(block[item_ids], axis=0))
+
+        return dict(zip(candidates, totals))
+
+    def close(self):
+        """Unmap the bitmaps and remove them if they were written for this counter"""
+        self.bitmaps = None
+        if self._temporary_path is not None:
+            os.remove(self._temporary_path)
+            self._temporary_path = None
+
+
+# Counter for the transaction shard owned by the current worker process
+_shard_counter = None
+
+
+def _init_shard_worker(shard, method: str):
+    """Build the worker's shard counter once, when its process starts
+
+    For 'mmap' the shard is only (bitmap path, transaction count, byte range):
+    every worker maps the same file read-only.
+    """
+    global _shard_counter
+    if method == 'mmap':
+        _shard_counter = MmapBitsetSupportCounter(*shard)
+    else:
+        _shard_counter = make_support_counter(shard, method)
+
+
+def _count_shard(candidates: List[Tuple]) -> List[int]:
+    """Count candidates against the worker's shard, in the order given"""
+    counts = _shard_counter.count_many(frozenset(candidate) for candidate in candidates)
+    return [counts[frozenset(candidate)] for candidate in candidates]
+
+
+class ParallelSupportCounter:
+    """Count supports over transaction shards in worker processes and merge the counts
+
+    Each shard is handed to its own single-worker process pool when the pool
+    starts, so only candidates and counts cross process boundaries per level.
+    """
+
+    def __init__(self, shards: List, method: str, n_transactions: int):
+        self.n_transactions = n_transactions
+        self._executors = [
+            ProcessPoolExecutor(max_workers=1, initializer=_init_shard_worker, initargs=(shard, method))
+            for shard in shards
+        ]
+        self.name = f"{method} x {len(self._executors)} processes"
+        # Bitmap file written only for this counter, removed on close()
+        self._temporary_path = None
+
+    def count(self, itemset: frozenset) -> int:
+        """Count transactions containing every item of the itemset"""
+        return self.count_many([itemset])[frozenset(itemset)]
+
+    def count_many(self, candidates: Iterable[frozenset]) -> Dict[frozenset, int]:
+        """Count a batch of candidates on every shard and sum the shard counts"""
+        candidates = [frozenset(candidate) for candidate in candidates]
+        if not candidates:
+            return {}
+
+        payload = [tuple(candidate) for candidate in candidates]
+        futures = [executor.submit(_count_shard, payload) for executor in self._executors]
+
+        totals = [0] * len(candidates)
+        for future in futures:
+            for i, count in enumerate(future.result()):
+                totals[i] += count
+        return dict(zip(candidates, totals))
+
+    def close(self):
+        """Shut down the worker processes"""
+        for executor in self._executors:
+            executor.shutdown()
+        self._executors = []
+        if self._temporary_path is not None:
+            os.remove(self._temporary_path)
+            self._temporary_path = None
+
+
+def resolve_n_jobs(n_jobs: int) -> int:
+    """Turn an n_jobs setting into a process count (negative values count back from the CPU count)"""
+    if n_jobs is None:
+        return 1
+    if n_jobs == 0:
+        raise ValueError("n_jobs must be a non-zero integer")
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return n_jobs
+
+
+def bitsets_fit(bitset_bytes: int, memory_limit: int = None) -> bool:
+    """Whether bitmaps taking ``bitset_bytes`` fit in ``memory_limit`` (by default a share of the available memory)"""
+    if memory_limit is None:
+        available = available_memory_bytes()
+        if available is None:
+            memory_limit = DEFAULT_BITSET_MEMORY_LIMIT
+        else:
+            memory_limit = int(available * BITSET_MEMORY_FRACTION)
+    return bitset_bytes <= memory_limit
+
+
+def make_support_counter(transactions: List[List[Hashable]], method: str = 'auto',
+                         memory_limit: int = None, n_jobs: int = 1):
+    """Create the support counting backend for a list of transactions
+
+    In 'auto' mode the bitset backend is used whenever its bitmaps fit in
+    ``memory_limit`` bytes (by default a share of the available memory).
+    Otherwise encoded TransactionStore transactions are counted from on-disk
+    bitmaps ('mmap') and plain lists are scanned. With ``n_jobs`` > 1 the
+    transactions are split into shards counted in separate processes.
+    """
+    if method not in SUPPORT_COUNTING_METHODS:
+        raise ValueError(f"Unknown support counting method '{method}'. "
+                         f"Choose one of {SUPPORT_COUNTING_METHODS}")
+
+    store = getattr(transactions, 'store', None)
+
+    if method == 'auto':
+        if bitsets_fit(estimate_bitset_bytes(transactions), memory_limit):
+            method = 'bitset'
+        else:
+            method = 'mmap' if store is not None else 'scan'
+
+    n_jobs = min(resolve_n_jobs(n_jobs), max(1, len(transactions)))
+
+    if method == 'mmap':
+        return _make_mmap_counter(store, n_jobs)
+
+    if n_jobs > 1:
+        shard_size = -(-len(transactions) // n_jobs)
+        shards = [transactions[start:start + shard_size] for start in range(0, len(transactions), shard_size)]
+        return ParallelSupportCounter(shards, method, len(transactions))
+
+    if method == 'bitset':
+        return BitsetSupportCounter(transactions)
+    return ScanSupportCounter(transactions)
+
+
+def _make_mmap_counter(store, n_jobs: int):
+    """Counter over the store's on-disk item bitmaps, split into byte ranges across n_jobs processes"""
+    if store is None:
+        raise ValueError("'mmap' support counting needs encoded transactions from a TransactionStore")
+
+    path = store.item_bitmap_file()
+    temporary_path = None
+    if path is None:
+        # In-memory store: write the bitmaps to a scratch file for the lifetime of the counter
+        fd, temporary_path = tempfile.mkstemp(suffix='.npy')
+        os.close(fd)
+        path = store.write_item_bitmaps(temporary_path)
+
+    n_transactions = len(store)
+    if n_jobs > 1:
+        n_bytes = (n_transactions + 7) // 8
+        shard_bytes = -(-n_bytes // n_jobs)
+        shards = [(path, n_transactions, start, min(start + shard_bytes, n_bytes))
+                  for start in range(0, n_bytes, shard_bytes)]
+        counter = ParallelSupportCounter(shards, 'mmap', n_transactions)
+    else:
+        counter = MmapBitsetSupportCounter(path, n_transactions)
+
+    counter._temporary_path = temporary_path
+    return counter
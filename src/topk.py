@@ -0,0 +1,166 @@
+import heapq
+from itertools import count
+from typing import List, Hashable, Tuple
+
+try:
+    from .support_counting import item_bitmaps, _popcount
+except ImportError:
+    from support_counting import item_bitmaps, _popcount
+
+TOP_K_METRICS = ('support', 'confidence', 'lift')
+
+
+class TopKRules:
+    """Mine the k best association rules by a metric without a support threshold (TopKRules-style)
+
+    Rules grow from one-item rules by adding items to the antecedent (left
+    expansion) or the consequent (right expansion), in item order, so every
+    rule is built exactly once: one side is grown first, and a rule made by
+    expanding the other side is only expanded on that side again. Supports
+    come from transaction bitmaps.
+
+    The threshold is the k-th best value found so far and rises while mining.
+    For support it prunes every expansion below it, since expansions only lose
+    support. For lift the consequent is grown first, and left expansions of a
+    rule X -> Y are pruned once 1 / support(Y) (their highest possible lift)
+    falls below it. For confidence the antecedent is grown first, and right
+    expansions of X -> Y are pruned once confidence(X -> Y) falls below it:
+    with X fixed, adding consequent items never raises the confidence, and the
+    search stops once k rules have a confidence of 1. Rules seen in fewer than
+    ``min_count`` transactions are skipped for every metric.
+    """
+
+    def __init__(self, k: int = 100, metric: str = 'confidence', min_count: int = 10,
+                 min_confidence: float = 0.0):
+        if metric not in TOP_K_METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Choose one of {TOP_K_METRICS}")
+        self.k = k
+        self.metric = metric
+        self.min_count = max(1, min_count)
+        self.min_confidence = min_confidence
+        # Side grown first; rules made by expanding the other side only expand that side again
+        self._first_side = 'left' if metric == 'confidence' else 'right'
+
+    def find_rules(self, transactions: List[List[Hashable]]) -> List[Tuple[Tuple, Tuple, int, int, int]]:
+        """Return (antecedent, consequent, rule count, antecedent count, consequent count) of the best rules, best first"""
+        self._total = len(transactions)
+        if not self._total or self.k <= 0:
+            return []
+
+        bitmaps = item_bitmaps(transactions)
+        self._bitmaps = {item: tids for item, tids in bitmaps.items() if _popcount(tids) >= self.min_count}
+        self._items = sorted(self._bitmaps)
+        self._top = []
+        self._sequence = count()
+
+        # Score every one-item rule before expanding any, so the threshold starts high
+        seeds = []
+        for antecedent_item in self._items:
+            antecedent_tids = self._bitmaps[antecedent_item]
+            antecedent_count = _popcount(antecedent_tids)
+            for consequent_item in self._items:
+                if consequent_item == antecedent_item:
+                    continue
+                rule_tids = antecedent_tids & self._bitmaps[consequent_item]
+                rule_count = _popcount(rule_tids)
+                if rule_count < self.min_count:
+                    continue
+                consequent_tids = self._bitmaps[consequent_item]
+                rule = ((antecedent_item,), (consequent_item,), antecedent_tids, consequent_tids, rule_tids,
+                        rule_count, antecedent_count, _popcount(consequent_tids))
+                seeds.append((self._consider(rule), rule))
+
+        seeds.sort(key=lambda seed: seed[0], reverse=True)
+        for _, rule in seeds:
+            self._expand(rule, expand_left=True, expand_right=True)
+
+        best = sorted(self._top, key=lambda entry: (entry[0], entry[2][2]), reverse=True)
+        return [rule for _, _, rule in best]
+
+    def _value(self, rule_count: int, antecedent_count: int, consequent_count: int) -> float:
+        if self.metric == 'support':
+            return rule_count / self._total
+        if self.metric == 'confidence':
+            return rule_count / antecedent_count
+        return rule_count * self._total / (antecedent_count * consequent_count)
+
+    def _threshold(self) -> float:
+        """Value a rule must beat to enter the top k, None until k rules were found"""
+        return self._top[0][0] if len(self._top) >= self.k else None
+
+    def _consider(self, rule: Tuple) -> float:
+        """Score a rule and keep it if it is among the k best so far"""
+        antecedent, consequent, _, _, _, rule_count, antecedent_count, consequent_count = rule
+        value = self._value(rule_count, antecedent_count, consequent_count)
+        if rule_count / antecedent_count < self.min_confidence:
+            return value
+
+        entry = (value, next(self._sequence), (antecedent, consequent, rule_count, antecedent_count, consequent_count))
+        if len(self._top) < self.k:
+            heapq.heappush(self._top, entry)
+        elif value > self._top[0][0]:
+            heapq.heapreplace(self._top, entry)
+        return value
+
+    def _min_rule_count(self) -> int:
+        threshold = self._threshold()
+        if self.metric == 'support' and threshold is not None:
+            return max(self.min_count, int(threshold * self._total))
+        return self.min_count
+
+    def _expand(self, rule: Tuple, expand_left: bool, expand_right: bool):
+        """Score the left and/or right expansions of a rule and recurse into them, best first"""
+        antecedent, consequent, antecedent_tids, consequent_tids, rule_tids, rule_count, antecedent_count, \
+            consequent_count = rule
+        threshold = self._threshold()
+        if threshold is not None:
+            if self.metric == 'support' and rule_count / self._total < threshold:
+                return
+            # Left expansions keep the consequent, so their lift is at most 1 / support(consequent)
+            if self.metric == 'lift' and self._total / consequent_count < threshold:
+                expand_left = False
+            if self.metric == 'confidence':
+                # No confidence beats a k-th best of 1
+                if threshold >= 1:
+                    return
+                # Right expansions keep the antecedent, so their confidence is at most this rule's
+                if rule_count / antecedent_count <= threshold:
+                    expand_right = False
+        if not expand_left and not expand_right:
+            return
+
+        min_rule_count = self._min_rule_count()
+        children = []
+        used = set(antecedent) | set(consequent)
+
+        if expand_left:
+            for item in self._items:
+                if item <= antecedent[-1] or item in used:
+                    continue
+                tids = self._bitmaps[item]
+                child_rule_tids = rule_tids & tids
+                child_rule_count = _popcount(child_rule_tids)
+                if child_rule_count < min_rule_count:
+                    continue
+                child_antecedent_tids = antecedent_tids & tids
+                child = (antecedent + (item,), consequent, child_antecedent_tids, consequent_tids, child_rule_tids,
+                         child_rule_count, _popcount(child_antecedent_tids), consequent_count)
+                children.append((self._consider(child), True, self._first_side == 'left', child))
+
+        if expand_right:
+            for item in self._items:
+                if item <= consequent[-1] or item in used:
+                    continue
+                tids = self._bitmaps[item]
+                child_rule_tids = rule_tids & tids
+                child_rule_count = _popcount(child_rule_tids)
+                if child_rule_count < min_rule_count:
+                    continue
+                child_consequent_tids = consequent_tids & tids
+                child = (antecedent, consequent + (item,), antecedent_tids, child_consequent_tids, child_rule_tids,
+                         child_rule_count, antecedent_count, _popcount(child_consequent_tids))
+                children.append((self._consider(child), self._first_side == 'right', True, child))
+
+        children.sort(key=lambda child: child[0], reverse=True)
+        for _, child_expand_left, child_expand_right, child in children:
+            self._expand(child, child_expand_left, child_expand_right)
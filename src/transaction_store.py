@@ -0,0 +1,295 @@
+import os
+import json
+import numpy as np
+from typing import List, Dict, Iterable, Iterator, Hashable, Union
+
+
+class TransactionStore:
+    """Transactions encoded as dense integer item IDs in a CSR layout
+
+    ``items`` is one flat int32 array holding every transaction's item IDs,
+    deduplicated and sorted within each transaction, and transaction i is
+    ``items[offsets[i]:offsets[i + 1]]``. ``vocabulary[item_id]`` is the item
+    name; the vocabulary is sorted, so ID order matches name order.
+
+    The store behaves like the ``List[List[str]]`` it replaces: ``len()``,
+    iteration and indexing return decoded item names. Miners work on the IDs
+    through ``encoded``.
+    """
+
+    def __init__(self, items: np.ndarray, offsets: np.ndarray, vocabulary: List[str], directory: str = None):
+        self.items = items
+        self.offsets = offsets
+        self.vocabulary = list(vocabulary)
+        # Set when the store is loaded from disk; derived files such as the item bitmaps live there too
+        self.directory = directory
+        self._item_to_id = None
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Iterable[str]]) -> 'TransactionStore':
+        """Encode a list of item-name transactions"""
+        transactions = [set(transaction) for transaction in transactions]
+        vocabulary = sorted(set().union(*transactions))
+        item_to_id = {item: i for i, item in enumerate(vocabulary)}
+
+        lengths = np.fromiter((len(transaction) for transaction in transactions), dtype=np.int64,
+                              count=len(transactions))
+        offsets = np.zeros(len(transactions) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        items = np.empty(offsets[-1], dtype=np.int32)
+        for i, transaction in enumerate(transactions):
+            items[offsets[i]:offsets[i + 1]] = sorted(item_to_id[item] for item in transaction)
+
+        return cls(items, offsets, vocabulary)
+
+    @classmethod
+    def from_codes(cls, transaction_codes: np.ndarray, item_codes: np.ndarray, vocabulary: List[str],
+                   min_rows: int = 1) -> 'TransactionStore':
+        """Build a store from one (transaction code, item code) pair per row, without Python loops
+
+        Rows with a negative code (missing key or item) are ignored, and
+        transactions with fewer than ``min_rows`` rows, counted before items are
+        deduplicated, are dropped. Transactions keep the order of their codes and
+        the vocabulary is reduced to the items that remain.
+        """
+        transaction_codes = np.asarray(transaction_codes, dtype=np.int64)
+        item_codes = np.asarray(item_codes, dtype=np.int64)
+
+        valid = (transaction_codes >= 0) & (item_codes >= 0)
+        transaction_codes = transaction_codes[valid]
+        item_codes = item_codes[valid]
+
+        row_counts = np.bincount(transaction_codes)
+        kept = row_counts >= min_rows
+        rows = kept[transaction_codes]
+        # Renumber the kept transactions 0..n-1 in their original order
+        transaction_ids = (np.cumsum(kept) - 1)[transaction_codes[rows]]
+        used_items, item_ids = np.unique(item_codes[rows], return_inverse=True)
+
+        order = np.lexsort((item_ids, transaction_ids))
+        transaction_ids = transaction_ids[order]
+        item_ids = item_ids[order]
+
+        # Drop repeated items within a transaction (adjacent after sorting)
+        distinct = np.ones(len(item_ids), dtype=bool)
+        distinct[1:] = (transaction_ids[1:] != transaction_ids[:-1]) | (item_ids[1:] != item_ids[:-1])
+        transaction_ids = transaction_ids[distinct]
+        item_ids = item_ids[distinct]
+
+        offsets = np.zeros(int(kept.sum()) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(transaction_ids, minlength=len(offsets) - 1), out=offsets[1:])
+
+        vocabulary = [vocabulary[code] for code in used_items]
+        return cls(item_ids.astype(np.int32), offsets, vocabulary)
+
+    @classmethod
+    def concat(cls, stores: List['TransactionStore']) -> 'TransactionStore':
+        """One store holding the transactions of every store in turn, over the union of their vocabularies
+
+        The merged vocabulary stays sorted, so remapping the item IDs keeps every
+        transaction sorted.
+        """
+        if len(stores) == 1:
+            return stores[0]
+        vocabulary = sorted(set().union(*(store.vocabulary for store in stores)))
+        items, offsets = [], [np.zeros(1, dtype=np.int64)]
+        end = 0
+        for store in stores:
+            mapping = np.searchsorted(vocabulary, store.vocabulary).astype(np.int32)
+            items.append(mapping[store.items] if len(store.items) else store.items.astype(np.int32))
+            offsets.append(store.offsets[1:] + end)
+            end += int(store.offsets[-1])
+        return cls(np.concatenate(items), np.concatenate(offsets), vocabulary)
+
+    @property
+    def item_to_id(self) -> Dict[str, int]:
+        if self._item_to_id is None:
+            self._item_to_id = {item: i for i, item in enumerate(self.vocabulary)}
+        return self._item_to_id
+
+    @property
+    def n_items(self) -> int:
+        return len(self.vocabulary)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the item and offset arrays"""
+        return self.items.nbytes + self.offsets.nbytes
+
+    @property
+    def encoded(self) -> 'EncodedTransactions':
+        """View of the transactions as lists of item IDs, for the miners"""
+        return EncodedTransactions(self)
+
+    def lengths(self) -> np.ndarray:
+        """Number of distinct items in every transaction"""
+        return np.diff(self.offsets)
+
+    def item_ids(self, index: int) -> np.ndarray:
+        """Item IDs of one transaction"""
+        return self.items[self.offsets[index]:self.offsets[index + 1]]
+
+    def decode(self, item_ids: Iterable[int]) -> List[str]:
+        """Translate item IDs back to item names"""
+        return [self.vocabulary[item_id] for item_id in item_ids]
+
+    def slice(self, start: int, stop: int) -> 'TransactionStore':
+        """Store holding transactions start..stop-1, sharing the vocabulary"""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        items = self.items[self.offsets[start]:self.offsets[stop]]
+        offsets = self.offsets[start:stop + 1] - self.offsets[start]
+        return TransactionStore(items, offsets, self.vocabulary)
+
+    def take(self, indices: Iterable[int]) -> 'TransactionStore':
+        """Store holding the transactions at ``indices``, in that order, sharing the vocabulary"""
+        indices = np.asarray(indices, dtype=np.int64)
+        starts = self.offsets[indices]
+        lengths = self.offsets[indices + 1] - starts
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # Position in self.items of every item of the selected transactions
+        positions = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return TransactionStore(self.items[positions], offsets, self.vocabulary)
+
+    def item_bitmaps(self) -> Dict[int, int]:
+        """Build one transaction-ID bitmap (a Python int) per item ID, vectorized over the CSR arrays"""
+        tids = np.repeat(np.arange(len(self), dtype=np.int64), self.lengths())
+        order = np.argsort(self.items, kind='stable')
+        sorted_items = self.items[order]
+        sorted_tids = tids[order]
+        boundaries = np.flatnonzero(np.diff(sorted_items)) + 1
+
+        n_bytes = (len(self) + 7) // 8
+        bitmaps = {}
+        starts = np.concatenate(([0], boundaries))
+        for start, item_tids in zip(starts, np.split(sorted_tids, boundaries)):
+            if not len(item_tids):
+                continue
+            buffer = np.zeros(n_bytes, dtype=np.uint8)
+            np.bitwise_or.at(buffer, item_tids >> 3, (1 << (item_tids & 7)).astype(np.uint8))
+            bitmaps[int(sorted_items[start])] = int.from_bytes(buffer.tobytes(), 'little')
+        return bitmaps
+
+    def save(self, directory: str):
+        """Write the store as items.npy, offsets.npy and vocabulary.json in ``directory``"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'items.npy'), np.ascontiguousarray(self.items))
+        np.save(os.path.join(directory, 'offsets.npy'), np.ascontiguousarray(self.offsets))
+        with open(os.path.join(directory, 'vocabulary.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.vocabulary, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'TransactionStore':
+        """Load a store written by save(), memory-mapping the arrays read-only by default"""
+        mmap_mode = 'r' if mmap else None
+        items = np.load(os.path.join(directory, 'items.npy'), mmap_mode=mmap_mode)
+        offsets = np.load(os.path.join(directory, 'offsets.npy'), mmap_mode=mmap_mode)
+        with open(os.path.join(directory, 'vocabulary.json'), encoding='utf-8') as f:
+            vocabulary = json.load(f)
+        return cls(items, offsets, vocabulary, directory=directory)
+
+    def write_item_bitmaps(self, path: str, block_transactions: int = 1 << 20) -> str:
+        """Write packed per-item transaction bitmaps to a .npy file, one row of bits per item ID
+
+        Row ``item_id`` has bit ``tid`` set (little bit order within each byte)
+        when transaction ``tid`` contains the item. The file is filled one block
+        of transactions at a time, so memory stays bounded by the block size.
+        """
+        n_bytes = (len(self) + 7) // 8
+        matrix = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=(self.n_items, n_bytes))
+        # Blocks start on a byte boundary so each one writes its own byte columns
+        block_transactions = max(8, block_transactions - block_transactions % 8)
+
+        for start in range(0, len(self), block_transactions):
+            stop = min(start + block_transactions, len(self))
+            block = self.slice(start, stop)
+            tids = np.repeat(np.arange(len(block), dtype=np.int64), block.lengths())
+            columns = matrix[:, start // 8:(stop + 7) // 8]
+            np.bitwise_or.at(columns, (block.items, tids >> 3), (1 << (tids & 7)).astype(np.uint8))
+
+        matrix.flush()
+        del matrix
+        return path
+
+    def item_bitmap_file(self) -> str:
+        """Path of the store's on-disk item bitmaps, written next to the store on first use
+
+        Returns None for stores that were not loaded from disk.
+        """
+        if self.directory is None:
+            return None
+        path = os.path.join(self.directory, 'item_bitmaps.npy')
+        if not os.path.exists(path):
+            # Write under a scratch name first so concurrent readers never map a partial file
+            scratch_path = f"{path}.{os.getpid()}.tmp.npy"
+            self.write_item_bitmaps(scratch_path)
+            os.replace(scratch_path, path)
+        return path
+
+    def item_counts(self) -> np.ndarray:
+        """Number of transactions containing each item ID"""
+        return np.bincount(self.items, minlength=self.n_items)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __iter__(self) -> Iterator[List[str]]:
+        for i in range(len(self)):
+            yield self.decode(self.item_ids(i))
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[List[str], List[List[str]]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transaction index out of range")
+        return self.decode(self.item_ids(index))
+
+    def __repr__(self) -> str:
+        return f"TransactionStore({len(self)} transactions, {self.n_items} items, {self.nbytes} bytes)"
+
+
+class EncodedTransactions:
+    """Sequence view of a TransactionStore yielding each transaction as a list of item IDs"""
+
+    def __init__(self, store: TransactionStore):
+        self.store = store
+
+    @property
+    def n_items(self) -> int:
+        return self.store.n_items
+
+    def item_bitmaps(self) -> Dict[int, int]:
+        return self.store.item_bitmaps()
+
+    def item_counts(self) -> np.ndarray:
+        return self.store.item_counts()
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __iter__(self) -> Iterator[List[int]]:
+        items = self.store.items
+        offsets = self.store.offsets
+        for i in range(len(self.store)):
+            yield items[offsets[i]:offsets[i + 1]].tolist()
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[List[int], 'EncodedTransactions']:
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                raise ValueError("EncodedTransactions only supports contiguous slices")
+            return EncodedTransactions(self.store.slice(index.start or 0,
+                                                        len(self) if index.stop is None else index.stop))
+        if index < 0:
+            index += len(self)
+        return self.store.item_ids(index).tolist()
+
+
+def encode_transactions(transactions: Union[TransactionStore, Iterable[Iterable[Hashable]]]) -> TransactionStore:
+    """Return the transactions as a TransactionStore, encoding plain lists if needed"""
+    if isinstance(transactions, TransactionStore):
+        return transactions
+    return TransactionStore.from_transactions(transactions)
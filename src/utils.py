@@ -1,13 +1,46 @@
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 import os
 import json
+import logging
 from datetime import datetime
 
+try:
+    from .transaction_store import TransactionStore
+except ImportError:
+    from transaction_store import TransactionStore
 
-def save_results(frequent_itemsets: Dict, rules: List[Dict], output_path: str):
-    """Save frequent itemsets and association rules to files"""
+logger = logging.getLogger(__name__)
+
+# Modules whose loggers set_verbosity() controls; they are named 'apriori' or 'src.apriori'
+# depending on how the package is imported, like this module
+LOGGED_MODULES = ('apriori', 'data_preprocessing', 'fpgrowth', 'utils', 'visualization')
+_PACKAGE = __name__.rpartition('.')[0]
+
+
+def set_verbosity(level: Union[int, str] = logging.INFO):
+    """Set how much the mining modules log
+
+    DEBUG adds the item frequency tables, itemset and rule dumps and sample
+    transactions, INFO the progress messages. Without a call the loggers follow
+    the root logger (WARNING by default), so runs stay quiet and the messages
+    are never formatted. A plain message handler is installed if the
+    application has not configured logging.
+    """
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    if not logging.getLogger().handlers:
+        logging.basicConfig(format='%(message)s')
+    for module in LOGGED_MODULES:
+        logging.getLogger(f"{_PACKAGE}.{module}" if _PACKAGE else module).setLevel(level)
+
+
+def save_results(frequent_itemsets: Dict, rules: List[Dict], output_path: str, run_stats: Any = None):
+    """Save frequent itemsets and association rules to files
+
+    ``run_stats`` (Apriori.run_stats, or a dict) is written to run_stats.json next to summary.json.
+    """
 
     # Create directory if it doesn't exist
     os.makedirs(output_path, exist_ok=True)
@@ -54,7 +87,11 @@ def save_results(frequent_itemsets: Dict, rules: List[Dict], output_path: str):
     with open(f"{output_path}/summary.json", 'w') as f:
         json.dump(summary, f, indent=2)
 
-    print(f"Results saved to {output_path}")
+    if run_stats is not None:
+        with open(f"{output_path}/run_stats.json", 'w') as f:
+            json.dump(run_stats.to_dict() if hasattr(run_stats, 'to_dict') else run_stats, f, indent=2)
+
+    logger.info("Results saved to %s", output_path)
 
 
 def print_summary(frequent_itemsets: Dict, rules: List[Dict]):
@@ -85,24 +122,29 @@ def print_summary(frequent_itemsets: Dict, rules: List[Dict]):
 def validate_transactions(transactions: List[List[str]]) -> bool:
     """Validate that transactions are in correct format"""
     if not transactions:
-        print("Error: No transactions provided")
+        logger.error("No transactions provided")
         return False
 
+    if isinstance(transactions, TransactionStore):
+        # Encoded stores only hold item IDs into a string vocabulary
+        logger.info("Validated %d transactions", len(transactions))
+        return True
+
     if not isinstance(transactions, list):
-        print("Error: Transactions should be a list")
+        logger.error("Transactions should be a list")
         return False
 
     for i, transaction in enumerate(transactions):
         if not isinstance(transaction, list):
-            print(f"Error: Transaction {i} is not a list")
+            logger.error("Transaction %d is not a list", i)
             return False
 
         for item in transaction:
             if not isinstance(item, str):
-                print(f"Error: Non-string item found in transaction {i}")
+                logger.error("Non-string item found in transaction %d", i)
                 return False
 
-    print(f"Validated {len(transactions)} transactions")
+    logger.info("Validated %d transactions", len(transactions))
     return True
 
 
@@ -139,7 +181,7 @@ def calculate_metrics(transactions: List[List[str]], rules: List[Dict]) -> Dict[
 def export_rules_excel(rules: List[Dict], filename: str = "association_rules.xlsx"):
     """Export association rules to Excel file with formatting"""
     if not rules:
-        print("No rules to export")
+        logger.warning("No rules to export")
         return
 
     # Create DataFrame
@@ -176,4 +218,4 @@ def export_rules_excel(rules: List[Dict], filename: str = "association_rules.xls
             adjusted_width = min(max_length + 2, 50)
             worksheet.column_dimensions[column_letter].width = adjusted_width
 
-    print(f"Rules exported to {filename}")
\ No newline at end of file
+    logger.info("Rules exported to %s", filename)
\ No newline at end of file
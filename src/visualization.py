@@ -3,8 +3,11 @@ import seaborn as sns
 import pandas as pd
 from typing import List, Dict
 import numpy as np
+import logging
 from mlxtend.preprocessing import TransactionEncoder
 
+logger = logging.getLogger(__name__)
+
 
 class DataVisualizer:
     def __init__(self):
@@ -88,7 +91,7 @@ class DataVisualizer:
     def plot_rules_metrics(self, rules: List[Dict]):
         """Plot scatter plot of support vs confidence for rules"""
         if not rules:
-            print("No rules to visualize")
+            logger.warning("No rules to visualize")
             return None
 
         supports = [rule['support'] for rule in rules]
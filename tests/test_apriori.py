@@ -0,0 +1,279 @@
+"""Candidate and rule generation against the original all-pairs / all-subsets implementations, on random data"""
+import random
+from itertools import combinations
+
+import pytest
+
+from apriori import Apriori
+from support_counting import min_support_count
+
+SEEDS = range(20)
+
+
+def all_pairs_apriori_gen(miner: Apriori, prev_frequent: dict, k: int) -> set:
+    """The original join: union every pair of (k-1)-itemsets and keep the k-item unions"""
+    candidates = set()
+    prev_itemsets = list(prev_frequent.keys())
+    for i in range(len(prev_itemsets)):
+        for j in range(i + 1, len(prev_itemsets)):
+            union_set = prev_itemsets[i].union(prev_itemsets[j])
+            if len(union_set) == k and not miner._has_infrequent_subset(union_set, prev_frequent):
+                candidates.add(frozenset(union_set))
+    return candidates
+
+
+def all_subsets_rules(frequent_itemsets: dict, total_transactions: int, min_confidence: float) -> list:
+    """The original rule generation: try every antecedent subset of every frequent itemset"""
+    support_counts = {itemset: round(support * total_transactions)
+                      for itemsets in frequent_itemsets.values() for itemset, support in itemsets.items()}
+    rules = []
+    for k, itemsets in frequent_itemsets.items():
+        if k < 2:
+            continue
+        for itemset, support in itemsets.items():
+            itemset_list = list(itemset)
+            for i in range(1, len(itemset_list)):
+                for antecedent in combinations(itemset_list, i):
+                    antecedent = frozenset(antecedent)
+                    consequent = itemset - antecedent
+                    confidence = (support * total_transactions) / support_counts[antecedent]
+                    if confidence >= min_confidence:
+                        consequent_support = support_counts[consequent] / total_transactions
+                        rules.append({
+                            'antecedent': set(antecedent),
+                            'consequent': set(consequent),
+                            'support': support,
+                            'confidence': confidence,
+                            'lift': confidence / consequent_support,
+                            'conviction': float('inf') if confidence == 1
+                            else (1 - consequent_support) / (1 - confidence)
+                        })
+    rules.sort(key=lambda rule: rule['confidence'], reverse=True)
+    return rules
+
+
+def random_transactions(rng: random.Random) -> list:
+    n_items = rng.randint(3, 15)
+    return [[f"i{rng.randint(0, n_items)}" for _ in range(rng.randint(1, 12))]
+            for _ in range(rng.randint(1, 120))]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('k', [2, 3, 4, 5])
+def test_prefix_join_matches_all_pairs(seed, k):
+    rng = random.Random(seed)
+    items = [f"i{item}" for item in range(rng.randint(k, 12))]
+    level = {frozenset(rng.sample(items, k - 1)): 0.1 for _ in range(rng.randint(0, 60))}
+    miner = Apriori()
+    assert miner._apriori_gen(level, k) == all_pairs_apriori_gen(miner, level, k)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_mined_levels_join_like_all_pairs(seed):
+    rng = random.Random(seed)
+    miner = Apriori(min_support=rng.choice([0.01, 0.05, 0.1]))
+    frequent_itemsets = miner.find_frequent_itemsets(random_transactions(rng))
+    for k in range(2, len(frequent_itemsets) + 2):
+        if frequent_itemsets.get(k - 1):
+            assert miner._apriori_gen(frequent_itemsets[k - 1], k) == \
+                all_pairs_apriori_gen(miner, frequent_itemsets[k - 1], k)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_rules_match_all_subsets_exactly(seed):
+    rng = random.Random(seed)
+    transactions = random_transactions(rng)
+    min_confidence = rng.choice([0.0, 0.1, 0.5, 0.8])
+    miner = Apriori(min_support=rng.choice([0.01, 0.05, 0.1, 0.2]), min_confidence=min_confidence)
+    frequent_itemsets = miner.find_frequent_itemsets(transactions)
+    rules = miner.generate_rules(transactions)
+    # Same rules, metrics and order
+    assert [dict(rule) for rule in rules] == all_subsets_rules(frequent_itemsets, len(transactions), min_confidence)
+
+
+def rule_keys(rules) -> list:
+    return sorted((sorted(rule['antecedent']), sorted(rule['consequent']), rule['support'], rule['confidence'],
+                   rule['lift']) for rule in rules)
+
+
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize('support_counting', ['auto', 'scan'])
+@pytest.mark.parametrize('algorithm', ['apriori', 'fpgrowth'])
+def test_updates_match_full_rerun(seed, support_counting, algorithm):
+    rng = random.Random(seed)
+    min_support, min_confidence = rng.choice([0.05, 0.1, 0.2]), rng.choice([0.0, 0.3, 0.7])
+    transactions = random_transactions(rng)
+    # New items may appear in later batches
+    batches = [[rng.sample([f"i{item}" for item in range(18)], rng.randint(1, 6)) for _ in range(rng.randint(1, 40))]
+               for _ in range(rng.randint(1, 4))]
+
+    miner = Apriori(min_support, min_confidence, support_counting=support_counting, algorithm=algorithm)
+    miner.find_frequent_itemsets(transactions)
+    miner.generate_rules(transactions)
+    for batch in batches:
+        miner.update(batch)
+        transactions = transactions + batch
+        rerun = Apriori(min_support, min_confidence, support_counting=support_counting, algorithm=algorithm)
+        rerun.find_frequent_itemsets(transactions)
+        rerun_rules = rerun.generate_rules(transactions)
+        assert miner.frequent_itemsets == rerun.frequent_itemsets
+        assert rule_keys(miner.association_rules) == rule_keys(rerun_rules)
+
+
+def test_update_after_son_raises():
+    transactions = random_transactions(random.Random(0))
+    miner = Apriori(0.05, 0.3)
+    miner.find_frequent_itemsets_son(lambda: [transactions[:30], transactions[30:]])
+    with pytest.raises(ValueError):
+        miner.update(transactions[:5])
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('support_counting', ['bitset', 'mmap'])
+def test_parallel_counting_matches_serial(seed, support_counting):
+    rng = random.Random(seed)
+    # The second dataset has fewer transactions than workers
+    for transactions in [random_transactions(rng), [['a', 'b', 'c']]]:
+        results = []
+        for n_jobs in [1, 2]:
+            miner = Apriori(0.05, 0.3, support_counting=support_counting, n_jobs=n_jobs)
+            itemsets = miner.find_frequent_itemsets(transactions)
+            results.append((itemsets, [dict(rule) for rule in miner.generate_rules(transactions)]))
+        assert results[0] == results[1]
+
+
+def brute_force_rule_metrics(transactions: list, metric: str, min_count: int, min_confidence: float) -> list:
+    """The metric of every rule over every itemset seen in at least min_count transactions, best first"""
+    transaction_sets = [set(transaction) for transaction in transactions]
+    items = sorted(set().union(*transaction_sets))
+    total = len(transactions)
+
+    def count(itemset):
+        return sum(itemset <= transaction for transaction in transaction_sets)
+
+    values = []
+    for size in range(2, len(items) + 1):
+        for itemset in combinations(items, size):
+            rule_count = count(set(itemset))
+            if rule_count < min_count:
+                continue
+            for antecedent_size in range(1, size):
+                for antecedent in combinations(itemset, antecedent_size):
+                    antecedent_count = count(set(antecedent))
+                    consequent_count = count(set(itemset) - set(antecedent))
+                    confidence = rule_count / antecedent_count
+                    if confidence < min_confidence:
+                        continue
+                    values.append({'support': rule_count / total, 'confidence': confidence,
+                                   'lift': rule_count * total / (antecedent_count * consequent_count)}[metric])
+    return sorted(values, reverse=True)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('metric', ['support', 'confidence', 'lift'])
+def test_top_k_rules_match_brute_force(seed, metric):
+    rng = random.Random(seed)
+    n_items = rng.randint(3, 8)
+    transactions = [[f"i{item}" for item in rng.sample(range(n_items), rng.randint(1, n_items))]
+                    for _ in range(rng.randint(5, 60))]
+    k, min_count, min_confidence = rng.randint(1, 30), rng.randint(1, 4), rng.choice([0.0, 0.0, 0.5])
+
+    rules = Apriori().top_k_rules(transactions, k=k, metric=metric, min_count=min_count,
+                                  min_confidence=min_confidence)
+    expected = brute_force_rule_metrics(transactions, metric, min_count, min_confidence)[:k]
+    assert [round(rule[metric], 9) for rule in rules] == [round(value, 9) for value in expected]
+    # Every reported metric is the rule's true value, not just the right ranking
+    supports = {frozenset(itemset): sum(set(itemset) <= set(t) for t in transactions) / len(transactions)
+                for rule in rules for itemset in (rule['antecedent'], rule['consequent'],
+                                                  rule['antecedent'] | rule['consequent'])}
+    for rule in rules:
+        itemset = frozenset(rule['antecedent'] | rule['consequent'])
+        antecedent, consequent = frozenset(rule['antecedent']), frozenset(rule['consequent'])
+        assert rule['support'] == pytest.approx(supports[itemset])
+        assert rule['confidence'] == pytest.approx(supports[itemset] / supports[antecedent])
+        assert rule['lift'] == pytest.approx(supports[itemset] / (supports[antecedent] * supports[consequent]))
+
+
+def small_random_transactions(rng: random.Random) -> list:
+    """Few enough items to enumerate every itemset"""
+    n_items = rng.randint(3, 9)
+    return [[f"i{item}" for item in rng.sample(range(n_items), rng.randint(1, n_items))]
+            for _ in range(rng.randint(5, 60))]
+
+
+def brute_force_frequent(transactions: list, min_support: float) -> dict:
+    """Transaction count of every itemset meeting min_support, enumerating every subset of the items"""
+    transaction_sets = [set(transaction) for transaction in transactions]
+    items = sorted(set().union(*transaction_sets))
+    min_count = min_support_count(min_support, len(transactions))
+    frequent = {}
+    for size in range(1, len(items) + 1):
+        for itemset in combinations(items, size):
+            itemset_count = sum(set(itemset) <= transaction for transaction in transaction_sets)
+            if itemset_count >= min_count:
+                frequent[frozenset(itemset)] = itemset_count
+    return frequent
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('output', ['closed', 'maximal'])
+def test_closed_and_maximal_match_brute_force(seed, output):
+    rng = random.Random(seed)
+    transactions = small_random_transactions(rng)
+    min_support = rng.choice([0.05, 0.1, 0.2, 0.4])
+    frequent = brute_force_frequent(transactions, min_support)
+    if output == 'closed':
+        expected = {itemset for itemset, itemset_count in frequent.items()
+                    if not any(itemset < other and other_count == itemset_count
+                               for other, other_count in frequent.items())}
+    else:
+        expected = {itemset for itemset in frequent if not any(itemset < other for other in frequent)}
+
+    miner = Apriori(min_support, 0.5, output=output)
+    mined = {itemset: support for itemsets in miner.find_frequent_itemsets(transactions).values()
+             for itemset, support in itemsets.items()}
+    assert set(mined) == expected
+    assert all(support == frequent[itemset] / len(transactions) for itemset, support in mined.items())
+    # Subsets left out are recovered with their exact support
+    supports = miner.get_supports(frequent)
+    assert all(supports[itemset] == pytest.approx(frequent[itemset] / len(transactions)) for itemset in frequent)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+@pytest.mark.parametrize('algorithm', ['apriori', 'fpgrowth'])
+def test_son_matches_single_pass(seed, algorithm):
+    rng = random.Random(seed)
+    transactions = random_transactions(rng)
+    min_support, min_confidence = rng.choice([0.05, 0.1, 0.2]), rng.choice([0.0, 0.3, 0.7])
+    # Uneven partitions, possibly empty or a single transaction
+    cuts = sorted(rng.randint(0, len(transactions)) for _ in range(rng.randint(0, 4)))
+    bounds = [0] + cuts + [len(transactions)]
+    partitions = [transactions[start:stop] for start, stop in zip(bounds, bounds[1:])]
+
+    single_pass = Apriori(min_support, min_confidence, algorithm=algorithm)
+    single_pass.find_frequent_itemsets(transactions)
+    single_pass_rules = single_pass.generate_rules(transactions)
+    son = Apriori(min_support, min_confidence, algorithm=algorithm)
+    son.find_frequent_itemsets_son(lambda: iter(partitions))
+    assert son.frequent_itemsets == single_pass.frequent_itemsets
+    assert rule_keys(son.generate_rules()) == rule_keys(single_pass_rules)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_verified_sample_matches_exact(seed):
+    rng = random.Random(seed)
+    n_items = rng.randint(4, 12)
+    transactions = [[f"i{item}" for item in rng.sample(range(n_items), rng.randint(1, min(n_items, 5)))]
+                    for _ in range(rng.randint(200, 400))]
+    min_support = rng.choice([0.2, 0.3])
+
+    exact = Apriori(min_support).find_frequent_itemsets(transactions)
+    exact = {itemset: support for itemsets in exact.values() for itemset, support in itemsets.items()}
+    miner = Apriori(min_support)
+    sampled = miner.find_frequent_itemsets_sampled(transactions, sample_size=rng.randint(100, 150),
+                                                   verify=True, random_state=seed)
+    sampled = {itemset: support for itemsets in sampled.values() for itemset, support in itemsets.items()}
+    # Verified supports are exact; only a frequent negative border itemset can leave frequent itemsets out
+    assert all(exact.get(itemset) == support for itemset, support in sampled.items())
+    if not miner.sampling_report['border_failures']:
+        assert sampled == exact
@@ -0,0 +1,64 @@
+"""Sketch estimates never undercount and overcount by at most their error bound"""
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from sketches import make_sketch, SKETCH_METHODS
+
+
+def zipf_stream(seed: int, length: int = 20000, n_keys: int = 2000) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.minimum(rng.zipf(1.3, length), n_keys).astype(np.int64)
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('method', SKETCH_METHODS)
+def test_estimates_within_bound(method, seed):
+    stream = zipf_stream(seed)
+    sketch = make_sketch(method, 0.005)
+    # Batches of varying size, as the level-wise miner feeds them
+    start = 0
+    rng = random.Random(seed)
+    while start < len(stream):
+        stop = start + rng.randint(1, 3000)
+        sketch.update(stream[start:stop])
+        start = stop
+
+    true_counts = Counter(stream.tolist())
+    assert sketch.total == len(stream)
+    bound = sketch.error_bound()
+    assert bound <= 0.005 * len(stream) + 1
+    estimates = {key: sketch.estimate(key) for key in range(1, 2001)}
+    assert all(estimates[key] >= true_counts.get(key, 0) for key in estimates)
+    over_bound = sum(estimates[key] - true_counts.get(key, 0) > bound for key in estimates)
+    if method == 'countmin':
+        # The Count-Min bound holds per key with probability 1 - failure_probability
+        assert over_bound <= 0.01 * len(estimates) + 2
+    else:
+        assert over_bound == 0
+
+
+@pytest.mark.parametrize('method', SKETCH_METHODS)
+def test_frequent_misses_no_frequent_key(method):
+    stream = zipf_stream(7)
+    sketch = make_sketch(method, 0.002)
+    sketch.update(stream)
+    min_count = 100
+    frequent = sketch.frequent(min_count, candidates=range(1, 2001))
+    true_counts = Counter(stream.tolist())
+    assert {key for key, count in true_counts.items() if count >= min_count} <= set(frequent)
+
+
+@pytest.mark.parametrize('method', ['lossy', 'spacesaving'])
+def test_batched_and_single_updates_keep_the_bounds(method):
+    stream = zipf_stream(3, length=5000)
+    single, batched = make_sketch(method, 0.01), make_sketch(method, 0.01)
+    for key in stream.tolist():
+        single.add(key)
+    batched.update(stream.tolist())
+    true_counts = Counter(stream.tolist())
+    for sketch in (single, batched):
+        for key in range(1, 2001):
+            assert 0 <= sketch.estimate(key) - true_counts.get(key, 0) <= sketch.error_bound()
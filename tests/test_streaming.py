@@ -0,0 +1,62 @@
+"""Sliding-window itemsets and rules against a batch run on each window's contents, fed from a chunked CSV"""
+import random
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+from apriori import Apriori
+from data_preprocessing import DataPreprocessor
+from streaming import SlidingWindowMiner
+
+
+def write_groceries_csv(path, seed: int, n_rows: int = 400) -> None:
+    """Random Member_number / Date / itemDescription rows, in no particular date order"""
+    rng = random.Random(seed)
+    start = pd.Timestamp('2015-01-01')
+    rows = [(rng.randint(1, 25), (start + pd.Timedelta(days=rng.randint(0, 20))).strftime('%d-%m-%Y'),
+             f"item {rng.randint(0, 8)}") for _ in range(n_rows)]
+    pd.DataFrame(rows, columns=['Member_number', 'Date', 'itemDescription']).to_csv(path, index=False)
+
+
+def rounded_itemsets(frequent_itemsets: dict) -> dict:
+    return {k: {itemset: round(support, 9) for itemset, support in itemsets.items()}
+            for k, itemsets in frequent_itemsets.items()}
+
+
+def rule_keys(rules) -> list:
+    return sorted((sorted(rule['antecedent']), sorted(rule['consequent']),
+                   round(rule['support'], 9), round(rule['confidence'], 9), round(rule['lift'], 9))
+                  for rule in rules)
+
+
+@pytest.mark.parametrize('chunksize', [50, 100000])
+def test_dated_transactions_match_batch_preparation(tmp_path, chunksize):
+    path = tmp_path / 'groceries.csv'
+    write_groceries_csv(path, seed=0)
+    dated = list(DataPreprocessor().iter_dated_transactions(str(path), chunksize=chunksize))
+
+    dates = [date for date, _ in dated]
+    assert dates == sorted(dates)
+    batch = DataPreprocessor().load_transactions(str(path), cache_dir=str(tmp_path / 'cache'))
+    assert Counter(tuple(sorted(items)) for _, items in dated) == Counter(tuple(sorted(items)) for items in batch)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_window_matches_batch_run(tmp_path, seed):
+    path = tmp_path / 'groceries.csv'
+    write_groceries_csv(path, seed)
+    min_support, min_confidence = 0.1, 0.3
+    # max_len covers every transaction (at most 9 distinct items), so nothing is cut off
+    window = SlidingWindowMiner('3D', min_support, min_confidence, max_len=9)
+
+    for date, items in DataPreprocessor().iter_dated_transactions(str(path), chunksize=60):
+        window.add(date, items)
+        contents = [list(items) for timestamp, items in window._transactions]
+        assert all(timestamp > date - pd.Timedelta('3D') for timestamp, _ in window._transactions)
+
+        batch = Apriori(min_support, min_confidence)
+        batch.find_frequent_itemsets(contents)
+        batch_rules = batch.generate_rules(contents)
+        assert rounded_itemsets(window.frequent_itemsets()) == rounded_itemsets(batch.frequent_itemsets)
+        assert rule_keys(window.rules()) == rule_keys(batch_rules)